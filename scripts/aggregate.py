@@ -0,0 +1,144 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from scripts.indicators import question_columns
+from scripts.ingest import KEY_COLS, iter_survey_chunks
+from scripts.regions import NO_REGION, RegionResolver
+
+STATS = ["sum", "count", "sumsq"]
+
+
+@dataclass(frozen=True, eq=False)
+class Aggregates:
+    cube: pd.DataFrame  # (region, year, month) x (score_col, sum|count|sumsq)
+    regional: pd.DataFrame  # region x score_col, pooled mean
+    monthly: pd.DataFrame  # (region, date) x score_col, monthly mean
+    ci_lower: pd.DataFrame  # same shape as monthly
+    ci_upper: pd.DataFrame
+
+
+def map_scores(col: pd.Series, mapping: dict) -> np.ndarray:
+    # categorical answers: map the (few) categories, then gather by code
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        lut = np.array(
+            [mapping.get(c, np.nan) for c in col.cat.categories] + [np.nan],
+            dtype=float,
+        )
+        return lut[col.cat.codes.to_numpy()]
+    return col.map(mapping).astype(float).to_numpy()
+
+
+def score_frame(df: pd.DataFrame, indicators: list[dict]) -> pd.DataFrame:
+    data = {c: df[c] for c in KEY_COLS}
+    for ind in indicators:
+        data[ind["score_col"]] = map_scores(df[ind["question_col"]], ind["mapping"])
+    return pd.DataFrame(data, index=df.index, copy=False)
+
+
+def cube_means(cube: pd.DataFrame) -> pd.DataFrame:
+    sums = cube.xs("sum", axis=1, level=1)
+    counts = cube.xs("count", axis=1, level=1)
+    return sums / counts.where(counts > 0)
+
+
+def add_date_index(frame: pd.DataFrame) -> pd.DataFrame:
+    keys = frame.index.to_frame(index=False)
+    date = pd.to_datetime(
+        dict(year=keys.iloc[:, 1], month=keys.iloc[:, 2], day=1)
+    ).rename("date")
+    out = frame.copy()
+    out.index = pd.MultiIndex.from_arrays([keys.iloc[:, 0], date])
+    return out.sort_index()
+
+
+def rolling_bands(values: pd.DataFrame, win: int = 3, z: float = 1.96):
+    """Centered rolling mean +/- z*std for every (region, date) series and column at once.
+
+    `values` is indexed by (region, date) and sorted; edge points without a
+    std fall back to +/- 0.05 around the value.
+    """
+    roll = values.groupby(level=0, sort=False, observed=True).rolling(
+        window=win, min_periods=2, center=True
+    )
+    m = roll.mean().droplevel(0)
+    s = roll.std(ddof=1).droplevel(0).fillna(0)
+    lo = (m - z * s).fillna(values - 0.05)
+    up = (m + z * s).fillna(values + 0.05)
+    return lo, up
+
+
+def region_slices(index: pd.Index) -> list[tuple[str, slice]]:
+    # rows are sorted by region, so each region is one contiguous block
+    if not len(index):
+        return []
+    regions = index.get_level_values(0)
+    starts = np.r_[0, np.flatnonzero(regions[1:] != regions[:-1]) + 1, len(regions)]
+    return [(regions[a], slice(a, b)) for a, b in zip(starts[:-1], starts[1:])]
+
+
+def month_frames(series: pd.Series, rows) -> tuple[pd.DatetimeIndex, np.ndarray]:
+    """Pivot a (region, date) series into a month x location matrix in one go.
+
+    rows is the region key of each map location, in map order; months with
+    no answers and locations with no region come out as NaN.
+    """
+    wide = series.unstack("date")
+    if wide.shape[1]:
+        dates = pd.date_range(wide.columns.min(), wide.columns.max(), freq="MS")
+    else:
+        dates = pd.DatetimeIndex([])
+    wide = wide.reindex(index=rows, columns=dates)
+    return dates, wide.to_numpy(dtype=float).T
+
+
+def rekey_regions(cube: pd.DataFrame, regions: RegionResolver) -> pd.DataFrame:
+    # survey names -> region codes; several names can share a code, so pool them
+    codes = regions.codes(cube.index.get_level_values(0))
+    keep = codes != NO_REGION
+    keys = [
+        pd.Index(codes[keep], name="region"),
+        cube.index.get_level_values(1)[keep],
+        cube.index.get_level_values(2)[keep],
+    ]
+    return cube[keep].groupby(keys, sort=True).sum()
+
+
+def partial_cube(df: pd.DataFrame, indicators: list[dict]) -> pd.DataFrame:
+    scores = score_frame(df, indicators)
+    values = scores[[ind["score_col"] for ind in indicators]]
+
+    # one grouped reduction for every indicator and statistic at once
+    wide = pd.concat(
+        {"sum": values, "count": values.notna(), "sumsq": values**2}, axis=1
+    )
+    cube = wide.groupby([scores[c] for c in KEY_COLS], observed=True, sort=True).sum()
+    cube.columns = cube.columns.swaplevel(0, 1)
+    return cube.reindex(columns=pd.MultiIndex.from_product([values.columns, STATS]))
+
+
+def combine_cubes(cubes) -> pd.DataFrame:
+    # cells are additive: partial cubes from any split of the rows merge by sum
+    return pd.concat(cubes).groupby(level=[0, 1, 2], observed=True, sort=True).sum()
+
+
+def stream_cube(path, indicators: list[dict], chunksize: int = 500_000):
+    """Same cube as partial_cube() on the whole file, holding one chunk at a time."""
+    cube = None
+    for chunk in iter_survey_chunks(path, question_columns(indicators), chunksize):
+        part = partial_cube(chunk, indicators)
+        cube = part if cube is None else combine_cubes([cube, part])
+    if cube is None:
+        empty = pd.DataFrame(columns=KEY_COLS + question_columns(indicators))
+        cube = partial_cube(empty, indicators)
+    return cube
+
+
+def aggregates_from_cube(cube: pd.DataFrame) -> Aggregates:
+    regional = cube_means(cube.groupby(level=0, observed=True).sum())
+    monthly = add_date_index(cube_means(cube))
+    lo, up = rolling_bands(monthly)
+    return Aggregates(
+        cube=cube, regional=regional, monthly=monthly, ci_lower=lo, ci_upper=up
+    )
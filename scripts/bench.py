@@ -0,0 +1,160 @@
+import argparse
+import gzip
+import json
+import platform
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from scripts import export2html as E
+from scripts.geometry import GEOJSON_PATH
+from scripts.indicators import REGISTRY_PATH, load_indicators
+from scripts.stages import StageTimer
+from scripts.synth import write_synth
+
+# ---------- config ----------
+BENCH_DIR = Path("data/bench")
+RESULTS_PATH = BENCH_DIR / "results.jsonl"
+DEFAULT_ROWS = [10_000, 100_000, 1_000_000]
+
+
+def git_revision() -> dict:
+    def git(*args):
+        return subprocess.run(
+            ["git", *args],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+
+    try:
+        return {
+            "commit": git("rev-parse", "HEAD"),
+            "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        }
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+
+
+def synth_path(rows: int, seed: int) -> Path:
+    path = BENCH_DIR / f"synth-{rows}-s{seed}.csv"
+    if not path.exists():
+        write_synth(path, rows, seed=seed)
+    return path
+
+
+def run_once(survey: Path, indicators: list[dict], out_dir: Path) -> dict:
+    """A first build of the page, stage by stage, as export() runs it."""
+    timer = StageTimer()
+    # build the artifact into out_dir and serve the page from that same build
+    E.GEOMETRY_DIR = out_dir / "geometry"
+    E.page_geometry.cache_clear()
+    E.life_exp_table.cache_clear()
+    with timer.stage("geometry"):
+        E.page_geometry()
+    # an empty store in out_dir: the survey is scanned into it, as for a new wave
+    out = E.export(
+        out_dir / "dashboard.html",
+        indicators,
+        survey=survey,
+        store=out_dir / "cube",
+        timer=timer,
+    )
+
+    data = out.read_bytes()
+    return {
+        "stages": timer.as_dict(),
+        "total_s": sum(r.wall_s for r in timer.results),
+        "output": {
+            "html_bytes": len(data),
+            "html_gz_bytes": len(gzip.compress(data, mtime=0)),
+        },
+        "table": timer.table(),
+    }
+
+
+def previous(results: Path, rows: int, commit: str | None) -> dict | None:
+    if not results.exists():
+        return None
+    last = None
+    for line in results.read_text(encoding="utf-8").splitlines():
+        rec = json.loads(line)
+        if rec["rows"] == rows and rec["commit"] != commit:
+            last = rec
+    return last
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark the export pipeline.")
+    ap.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS)
+    ap.add_argument(
+        "--survey",
+        type=Path,
+        default=None,
+        help="use this CSV instead of synthetic data",
+    )
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument(
+        "--repeat",
+        type=int,
+        default=2,
+        help="keep the fastest of N runs (the first pays plotly's warm-up)",
+    )
+    ap.add_argument("--indicators", type=Path, default=REGISTRY_PATH)
+    ap.add_argument("--results", type=Path, default=RESULTS_PATH)
+    ap.add_argument("--no-record", action="store_true")
+    args = ap.parse_args(argv)
+
+    if not Path(GEOJSON_PATH).exists():
+        ap.error(f"{GEOJSON_PATH} not found: the geometry stage builds from it")
+    indicators = load_indicators(args.indicators)
+    rev = git_revision()
+    inputs = (
+        [(args.survey, None)]
+        if args.survey
+        else [(synth_path(n, args.seed), n) for n in args.rows]
+    )
+    for survey, rows in inputs:
+        runs = []
+        for _ in range(args.repeat):
+            # a fresh directory per run, so the geometry stage always builds
+            with tempfile.TemporaryDirectory() as tmp:
+                runs.append(run_once(survey, indicators, Path(tmp)))
+        best = min(runs, key=lambda r: r["total_s"])
+        label = f"{rows:,} rows" if rows else str(survey)
+        print(f"\n== {label} ==\n{best.pop('table')}")
+        print(
+            f"total {best['total_s']:.3f} s, html {best['output']['html_bytes']:,} B "
+            f"({best['output']['html_gz_bytes']:,} B gzipped)"
+        )
+
+        record = {
+            **rev,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "rows": rows,
+            "survey": None if rows else str(survey),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "repeat": args.repeat,
+            **best,
+        }
+        before = previous(args.results, rows, rev["commit"]) if rows else None
+        if before:
+            ratio = (
+                record["total_s"] / before["total_s"]
+                if before["total_s"]
+                else float("nan")
+            )
+            print(
+                f"vs {before['commit'][:10]}: {before['total_s']:.3f} s -> x{ratio:.2f}"
+            )
+        if not args.no_record:
+            args.results.parent.mkdir(parents=True, exist_ok=True)
+            with args.results.open("a", encoding="utf-8") as fh:
+                fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    main()
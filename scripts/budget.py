@@ -0,0 +1,224 @@
+import argparse
+import gzip
+import json
+import re
+import sys
+from fnmatch import fnmatchcase
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:  # gzip-only report
+    brotli = None
+
+# ---------- config ----------
+BUDGETS_PATH = Path(__file__).with_name("budgets.json")
+METRICS = ("raw", "gzip", "brotli")
+
+_STYLE = re.compile(r"<style>(.*?)</style>", re.S)
+_SCRIPT = re.compile(r"<script>(.*?)</script>", re.S)
+_SHARED = "const SHARED = "
+_DASHES = "const DASHES = "
+_DECODER = json.JSONDecoder()
+
+
+# ---------- sizes ----------
+def sizes(data: bytes | str) -> dict:
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return {
+        "raw": len(data),
+        "gzip": len(gzip.compress(data, compresslevel=9, mtime=0)),
+        "brotli": len(brotli.compress(data, quality=11)) if brotli else None,
+    }
+
+
+# ---------- page parsing ----------
+def _skip(text: str, pos: int, chars: str = " \t\r\n,") -> int:
+    while pos < len(text) and text[pos] in chars:
+        pos += 1
+    return pos
+
+
+def _members(text: str, pos: int):
+    """Yield (key, source) for each member of the JSON object at text[pos]."""
+    pos = _skip(text, pos + 1)
+    while text[pos] != "}":
+        key, pos = _DECODER.raw_decode(text, pos)
+        pos = _skip(text, pos, " \t\r\n:")
+        start = pos
+        _, pos = _DECODER.raw_decode(text, pos)
+        yield key, text[start:pos]
+        pos = _skip(text, pos)
+
+
+def _elements(text: str, pos: int):
+    """Yield (value, source) for each element of the JSON array at text[pos]."""
+    pos = _skip(text, pos + 1)
+    while text[pos] != "]":
+        start = pos
+        value, pos = _DECODER.raw_decode(text, pos)
+        yield value, text[start:pos]
+        pos = _skip(text, pos)
+
+
+def _data_script(html: str) -> tuple[int, tuple[int, int], tuple[int, int]]:
+    # which inline script holds the SHARED and DASHES literals, and their spans
+    for i, script in enumerate(_SCRIPT.findall(html)):
+        if _SHARED in script and _DASHES in script:
+            try:
+                spans = []
+                for marker in (_SHARED, _DASHES):
+                    start = script.index(marker) + len(marker)
+                    spans.append((start, _DECODER.raw_decode(script, start)[1]))
+            except json.JSONDecodeError as e:
+                raise ValueError(f"page data is not JSON: {e}") from None
+            return i, *spans
+    raise ValueError("no SHARED/DASHES data: not a page written by export2html.py")
+
+
+def page_components(html: str) -> dict[str, str]:
+    """Split an exported page into named parts.
+
+    Names are "/"-separated: markup, css, js, shared/<KEY>, dash/<slug> and
+    dash/<slug>/<KEY>. Parts are sized on their own, so compressed sizes do
+    not add up to the page's.
+    """
+    i, (s0, s1), (d0, d1) = _data_script(html)
+    scripts = _SCRIPT.findall(html)
+    script = scripts[i]
+    scripts[i] = script[:s0] + script[s1:d0] + script[d1:]
+    parts = {
+        "markup": _SCRIPT.sub("", _STYLE.sub("", html)),
+        "css": "".join(_STYLE.findall(html)),
+        "js": "".join(scripts),
+    }
+    for key, src in _members(script, s0):
+        parts[f"shared/{key}"] = src
+    for dash, src in _elements(script, d0):
+        parts[f"dash/{dash['slug']}"] = src
+        for key, member in _members(src, 0):
+            if key != "slug":
+                parts[f"dash/{dash['slug']}/{key}"] = member
+    return parts
+
+
+def sidecar_files(html: str, page_dir: Path) -> dict[str, Path]:
+    # per-dashboard files a --sidecars page fetches; not part of the page itself
+    i, _, (d0, _) = _data_script(html)
+    script = _SCRIPT.findall(html)[i]
+    files = {}
+    for dash, _ in _elements(script, d0):
+        for key in ("URL", "TS_URL"):
+            if key in dash:
+                path = page_dir / dash[key]
+                files[f"sidecar/{dash['slug']}/{path.name}"] = path
+    return files
+
+
+def analyze(page: Path) -> dict[str, dict]:
+    page = Path(page)
+    html = page.read_text(encoding="utf-8")
+    rows = {"page": sizes(html)}
+    for name, text in page_components(html).items():
+        rows[name] = sizes(text)
+    for name, path in sidecar_files(html, page.parent).items():
+        # served as stored, so the gzip column is the file itself
+        data = path.read_bytes()
+        rows[name] = {**sizes(gzip.decompress(data)), "gzip": len(data)}
+    return rows
+
+
+# ---------- budgets ----------
+def load_budgets(path: Path = BUDGETS_PATH) -> dict[str, dict]:
+    """{pattern: {metric: max bytes}}; patterns match name segments with fnmatch."""
+    budgets = json.loads(Path(path).read_text(encoding="utf-8"))
+    for pattern, limits in budgets.items():
+        unknown = set(limits) - set(METRICS)
+        if unknown:
+            raise ValueError(f"{pattern}: unknown metric(s) {sorted(unknown)}")
+    return budgets
+
+
+def matches(pattern: str, name: str) -> bool:
+    # "dash/*" matches dash/eco but not dash/eco/MAP
+    p, n = pattern.split("/"), name.split("/")
+    return len(p) == len(n) and all(fnmatchcase(a, b) for a, b in zip(n, p))
+
+
+def check(rows: dict[str, dict], budgets: dict[str, dict]) -> list[dict]:
+    over = []
+    for pattern, limits in budgets.items():
+        for name in [name for name in rows if matches(pattern, name)]:
+            for metric, limit in limits.items():
+                size = rows[name][metric]
+                if size is not None and size > limit:
+                    over.append(
+                        {
+                            "component": name,
+                            "metric": metric,
+                            "size": size,
+                            "limit": limit,
+                            "pattern": pattern,
+                        }
+                    )
+    return over
+
+
+def table(rows: dict[str, dict], over: list[dict]) -> str:
+    flagged = {(o["component"], o["metric"]) for o in over}
+
+    def cell(name, metric):
+        size = rows[name][metric]
+        mark = "!" if (name, metric) in flagged else " "
+        return f"{'-' if size is None else f'{size:,}':>11}{mark}"
+
+    width = max(len(n) for n in rows) + 2
+    lines = [f"{'component':<{width}}" + "".join(f"{m:>12}" for m in METRICS)]
+    for name in rows:
+        lines.append(f"{name:<{width}}" + "".join(cell(name, m) for m in METRICS))
+    return "\n".join(lines)
+
+
+def report(rows: dict[str, dict], over: list[dict]):
+    print(table(rows, over))
+    if brotli is None:
+        print("(brotli not installed: pip install brotli for the brotli column)")
+    for o in over:
+        print(
+            f"OVER BUDGET {o['component']} {o['metric']}: "
+            f"{o['size']:,} B > {o['limit']:,} B ({o['pattern']})",
+            file=sys.stderr,
+        )
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(
+        description="Break an exported dashboard page down by component "
+        "and check it against size budgets."
+    )
+    ap.add_argument("page", type=Path, nargs="?", default=Path("docs/dashboard.html"))
+    ap.add_argument("--budgets", type=Path, default=BUDGETS_PATH)
+    ap.add_argument(
+        "--json", type=Path, default=None, help="also write the report here"
+    )
+    ap.add_argument(
+        "--no-fail", action="store_true", help="report budget overruns, exit 0"
+    )
+    args = ap.parse_args(argv)
+
+    try:
+        rows = analyze(args.page)
+    except ValueError as e:
+        ap.error(f"{args.page}: {e}")
+    over = check(rows, load_budgets(args.budgets))
+    report(rows, over)
+    if args.json:
+        data = {"page": str(args.page), "components": rows, "over_budget": over}
+        args.json.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+    if over and not args.no_fail:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
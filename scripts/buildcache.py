@@ -0,0 +1,50 @@
+import hashlib
+import json
+from pathlib import Path
+
+from scripts.ingest import CACHE_DIR
+
+BUILD_DIR = CACHE_DIR / "build"
+
+
+def fingerprint(*parts) -> str:
+    blob = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class BuildCache:
+    """Manifest plus cached page fragments for incremental exports."""
+
+    def __init__(self, root: Path = BUILD_DIR):
+        self.root = Path(root)
+        self.manifest_path = self.root / "manifest.json"
+        if self.manifest_path.exists():
+            self.manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        else:
+            self.manifest = {}
+
+    # ---------- fragments (JSON) ----------
+    def _fragment_path(self, name: str, key: str) -> Path:
+        return self.root / "fragments" / f"{name}-{key[:16]}.json"
+
+    def load_fragment(self, name: str, key: str) -> dict | None:
+        entry = self.manifest.get(name)
+        path = self._fragment_path(name, key)
+        if not entry or entry.get("fragment") != key or not path.exists():
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def save_fragment(self, name: str, key: str, fragment: dict):
+        path = self._fragment_path(name, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(fragment, ensure_ascii=False), encoding="utf-8")
+        old = self.manifest.get(name, {}).get("fragment")
+        if old and old != key:
+            self._fragment_path(name, old).unlink(missing_ok=True)
+        self.manifest.setdefault(name, {})["fragment"] = key
+
+    def save(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.manifest_path.write_text(
+            json.dumps(self.manifest, indent=1, sort_keys=True), encoding="utf-8"
+        )
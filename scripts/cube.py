@@ -0,0 +1,224 @@
+import argparse
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from scripts.aggregate import STATS, partial_cube, stream_cube
+from scripts.buildcache import fingerprint
+from scripts.indicators import REGISTRY_PATH, load_indicators, question_columns
+from scripts.ingest import KEY_COLS, file_sha256, load_survey
+
+# ---------- config ----------
+CUBE_DIR = Path("data/cube")
+CUBE_VERSION = 1
+CELL_COLS = ["region", "year", "month", "indicator"]
+
+
+def _stat(path: Path) -> list[int]:
+    st = path.stat()
+    return [st.st_size, st.st_mtime_ns]
+
+
+def indicator_key(ind: dict) -> str:
+    # cells depend on the question and its scoring, not on labels or titles
+    return fingerprint(ind["question_col"], ind["mapping"])[:16]
+
+
+def to_long(cube: pd.DataFrame, keys: dict[str, str]) -> pd.DataFrame:
+    """(region, year, month) x (score_col, stat) -> one row per cell and indicator."""
+    long = cube.stack(level=0, future_stack=True)[STATS]
+    long.index = long.index.set_names(CELL_COLS)
+    long = long.reset_index()
+    long["indicator"] = long["indicator"].map(keys)
+    long["region"] = long["region"].astype(str)
+    return long
+
+
+def to_wide(long: pd.DataFrame, names: list[tuple[str, str]]) -> pd.DataFrame:
+    """Inverse of to_long for the (key, score_col) pairs in `names`.
+
+    Indicators that share a question and mapping share a key, and each gets
+    its own copy of that key's cells.
+    """
+    keys = dict.fromkeys(key for key, _ in names)
+    long = long[long["indicator"].isin(keys)]
+    cube = long.groupby(CELL_COLS, sort=True)[STATS].sum().unstack("indicator")
+    cube.columns = cube.columns.swaplevel(0, 1)
+    cube = cube.reindex(
+        columns=pd.MultiIndex.from_tuples(
+            [(key, stat) for key, _ in names for stat in STATS]
+        )
+    ).fillna(0)
+    cube.columns = pd.MultiIndex.from_tuples(
+        [(score_col, stat) for _, score_col in names for stat in STATS]
+    )
+    for _, score_col in names:
+        cube[(score_col, "count")] = cube[(score_col, "count")].astype("int64")
+    cube.index = cube.index.set_names(KEY_COLS)
+    return cube
+
+
+class CubeStore:
+    """Per-wave partial cubes of (region, year, month, indicator) -> count, sum, sumsq.
+
+    Cells are additive, so the cube for all waves is the sum of the parts; a
+    new wave only scans its own rows. Regions keep their survey names here and
+    are mapped to map regions by the caller.
+    """
+
+    def __init__(self, root: Path = CUBE_DIR):
+        self.root = Path(root)
+        self.manifest_path = self.root / "cube.json"
+        self.manifest = {"version": CUBE_VERSION, "waves": {}}
+        if self.manifest_path.exists():
+            manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+            if manifest.get("version") == CUBE_VERSION:
+                self.manifest = manifest
+
+    @property
+    def waves(self) -> dict:
+        return self.manifest["waves"]
+
+    def signature(self) -> str:
+        return fingerprint(
+            {name: wave["sha256"] for name, wave in sorted(self.waves.items())}
+        )
+
+    def covered(self, wave: str) -> set[str]:
+        parts = self.waves.get(wave, {}).get("parts", [])
+        return {key for part in parts for key in part["indicators"]}
+
+    # ---------- write ----------
+    def merge_wave(
+        self,
+        path: Path,
+        indicators: list[dict],
+        *,
+        wave: str | None = None,
+        chunksize: int | None = None,
+    ) -> list[dict]:
+        """Add the cells of one survey file; returns the indicators that were scanned."""
+        path = Path(path)
+        wave = wave or path.stem
+        stat, entry = _stat(path), self.waves.get(wave)
+        if entry and entry.get("stat") == stat:
+            sha = entry["sha256"]  # same size and mtime as when it was hashed
+        else:
+            sha = file_sha256(path)
+            if entry and entry["sha256"] != sha:
+                # the file behind this wave changed: its old cells are void
+                self.drop_wave(wave)
+            elif entry:
+                entry["stat"] = stat
+                self.save()
+
+        done = self.covered(wave)
+        missing = [ind for ind in indicators if indicator_key(ind) not in done]
+        missing = list({indicator_key(ind): ind for ind in missing}.values())
+        if not missing:
+            return []
+
+        if chunksize:
+            cube = stream_cube(path, missing, chunksize)
+        else:
+            # the column cache lives with the store, so a fresh store starts cold
+            df = load_survey(
+                path, question_columns(missing), cache_dir=self.root / "survey"
+            )
+            cube = partial_cube(df, missing)
+        keys = {ind["score_col"]: indicator_key(ind) for ind in missing}
+        long = to_long(cube, keys)
+
+        part = (
+            self.root
+            / f"{wave}-{sha[:12]}-{fingerprint(sorted(keys.values()))[:12]}.parquet"
+        )
+        part.parent.mkdir(parents=True, exist_ok=True)
+        long.to_parquet(part, index=False)
+
+        entry = self.waves.setdefault(
+            wave, {"source": str(path), "sha256": sha, "parts": []}
+        )
+        entry["stat"] = stat
+        entry["parts"].append({"file": part.name, "indicators": sorted(keys.values())})
+        self.save()
+        return missing
+
+    def update(self, indicators: list[dict], chunksize: int | None = None):
+        """Scan each wave's source for indicators it does not cover yet."""
+        scanned = {}
+        for wave, entry in sorted(self.waves.items()):
+            if not Path(entry["source"]).exists():
+                continue
+            for ind in self.merge_wave(
+                entry["source"], indicators, wave=wave, chunksize=chunksize
+            ):
+                scanned[indicator_key(ind)] = ind
+        return list(scanned.values())
+
+    def drop_wave(self, wave: str):
+        for part in self.waves.pop(wave, {}).get("parts", []):
+            (self.root / part["file"]).unlink(missing_ok=True)
+        self.save()
+
+    def save(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.manifest_path.write_text(
+            json.dumps(self.manifest, indent=1, sort_keys=True, ensure_ascii=False),
+            encoding="utf-8",
+        )
+
+    # ---------- read ----------
+    def cube(self, indicators: list[dict]) -> pd.DataFrame:
+        """Cube over every wave in the store, in the layout of partial_cube()."""
+        names = list(
+            dict.fromkeys((indicator_key(ind), ind["score_col"]) for ind in indicators)
+        )
+        keys = {key for key, _ in names}
+        frames = []
+        for wave, entry in sorted(self.waves.items()):
+            missing = keys - self.covered(wave)
+            if missing:
+                raise KeyError(f"wave {wave!r} has no cells for {sorted(missing)}")
+            for part in entry["parts"]:
+                if set(part["indicators"]) & keys:
+                    frames.append(pd.read_parquet(self.root / part["file"]))
+        if not frames:
+            frames = [pd.DataFrame({c: [] for c in CELL_COLS + STATS})]
+        return to_wide(pd.concat(frames, ignore_index=True), names)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Manage the region x month cube store.")
+    ap.add_argument("--root", type=Path, default=CUBE_DIR)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    add = sub.add_parser("add", help="merge a survey wave into the store")
+    add.add_argument("path", type=Path)
+    add.add_argument("--wave", default=None, help="wave name (default: file stem)")
+    add.add_argument("--indicators", type=Path, default=REGISTRY_PATH)
+    add.add_argument("--chunksize", type=int, default=None)
+    drop = sub.add_parser("drop", help="remove a wave and its cells")
+    drop.add_argument("wave")
+    sub.add_parser("list", help="show the waves in the store")
+    args = ap.parse_args(argv)
+
+    store = CubeStore(args.root)
+    if args.cmd == "add":
+        indicators = load_indicators(args.indicators)
+        scanned = store.merge_wave(
+            args.path, indicators, wave=args.wave, chunksize=args.chunksize
+        )
+        print(
+            f"Merged {args.path}: {len(scanned)}/{len(indicators)} indicators scanned"
+        )
+    elif args.cmd == "drop":
+        store.drop_wave(args.wave)
+    for name, wave in sorted(store.waves.items()):
+        print(
+            f"{name}\t{wave['sha256'][:12]}\t{wave['source']}\t{len(store.covered(name))} indicators"
+        )
+
+
+if __name__ == "__main__":
+    main()
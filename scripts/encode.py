@@ -0,0 +1,87 @@
+import base64
+import json
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+
+try:
+    import orjson
+except ImportError:  # plain json works, just slower
+    orjson = None
+
+# ---------- serialization backend ----------
+JSON_ENGINE = "orjson" if orjson is not None else "json"
+FLOAT_DTYPE = "f4"  # ~7 significant digits, plenty for 0..4 scores
+MONTH_DTYPE = "i2"
+
+
+def dumps(obj) -> str:
+    """Strict JSON (NaN -> null), NumPy-aware, non-ASCII kept as is."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode("utf-8")
+    return json.dumps(
+        _plain(obj), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    )
+
+
+def _plain(obj):
+    # fallback path: what orjson does natively for NumPy values and NaN
+    if isinstance(obj, dict):
+        return {k: _plain(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_plain(v) for v in obj]
+    if isinstance(obj, np.ndarray):
+        return _plain(obj.tolist())
+    if isinstance(obj, np.generic):
+        obj = obj.item()
+    if isinstance(obj, float) and obj != obj:
+        return None
+    return obj
+
+
+def fig_json(fig) -> str:
+    return pio.to_json(fig, validate=False, engine=JSON_ENGINE)
+
+
+def typed_array(values, dtype: str = FLOAT_DTYPE) -> dict:
+    """plotly.js (>= 2.28) typed-array spec: little-endian bytes, base64-encoded."""
+    arr = np.ascontiguousarray(values, dtype=np.dtype(dtype).newbyteorder("<"))
+    return {"dtype": dtype, "bdata": base64.b64encode(arr.tobytes()).decode("ascii")}
+
+
+def month_index(dates) -> np.ndarray:
+    # months since 1970-01; the page maps them onto one shared month axis
+    dates = pd.DatetimeIndex(dates)
+    return ((dates.year - 1970) * 12 + dates.month - 1).to_numpy()
+
+
+def month_axis(first: int, last: int) -> list[str]:
+    months = pd.period_range(
+        pd.Period("1970-01", "M") + first, pd.Period("1970-01", "M") + last, freq="M"
+    )
+    return months.to_timestamp().strftime("%Y-%m-%d").tolist()
+
+
+def from_typed_array(spec) -> np.ndarray:
+    """Inverse of typed_array; plain lists pass through as float arrays."""
+    if not isinstance(spec, dict):
+        return np.asarray(spec, dtype=float)
+    dtype = np.dtype(spec["dtype"]).newbyteorder("<")
+    return np.frombuffer(base64.b64decode(spec["bdata"]), dtype=dtype)
+
+
+def series_payload(months, values, lower, upper) -> dict:
+    # one region's series as the page decodes it: month indices plus f4 values
+    return {
+        "m": typed_array(months, MONTH_DTYPE),
+        "v": typed_array(values),
+        "lo": typed_array(lower),
+        "hi": typed_array(upper),
+    }
+
+
+def month_dates(months) -> pd.DatetimeIndex:
+    # month indices (see month_index) back to month-start timestamps
+    periods = pd.PeriodIndex.from_ordinals(np.asarray(months, dtype="int64"), freq="M")
+    return periods.to_timestamp()
@@ -1,186 +1,100 @@
+import argparse
+import gzip
 import json
+import sys
+from functools import lru_cache
 from pathlib import Path
 
-import geopandas as gpd
-import pandas as pd
-import plotly.express as px
+import numpy as np
 import plotly.graph_objects as go
-import plotly.io as pio
-from shapely import wkt
-from shapely.geometry import MultiPolygon, Polygon
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scripts import budget
+from scripts.aggregate import (
+    Aggregates,
+    aggregates_from_cube,
+    month_frames,
+    region_slices,
+    rekey_regions,
+)
+from scripts.buildcache import BuildCache, fingerprint
+from scripts.cube import CUBE_DIR, CubeStore, indicator_key
+from scripts.encode import (
+    dumps,
+    fig_json,
+    month_axis,
+    month_index,
+    series_payload,
+    typed_array,
+)
+from scripts.geometry import ARTIFACT_DIR, Geometry, load_geometry, pick_level
+from scripts.indicators import REGISTRY_PATH, load_indicators
+from scripts.ingest import file_sha256
+from scripts.life_exp import LifeExpTable, load_life_exp
+from scripts.regions import REGISTRY_PATH as REGIONS_PATH, default_regions
+from scripts.seasons import season_bands
+from scripts.stages import StageTimer
 
 # ---------- config ----------
 DATA_DIR = Path("data")
 CSV_SURVEY = DATA_DIR / "survey_random.csv"
 CSV_LE = DATA_DIR / "LE_2017_2021.csv"
-GEOJSON_PATH = Path(
-    "geoBoundaries-KAZ-ADM1-all/geoBoundaries-KAZ-ADM1_simplified.geojson"
-)
 OUT_HTML = Path("docs/dashboard.html")
-OUT_HTML.parent.mkdir(parents=True, exist_ok=True)
-
-# ---------- load data once ----------
-df_base = pd.read_csv(CSV_SURVEY)
-gdf = gpd.read_file(GEOJSON_PATH)
-
-sh_name = "Shymkent"
-sh_iso = "KZ-SHY"
-sh_id = "9891525B68436750823948"
-sh_grp = "KAZ"
-sh_typ = "ADM1"
-sh_wkt = """POLYGON ((69.42977905273443 42.29850387573242, 69.440658569336 42.256446838378906,
-69.5219955444336 42.27233505249035, 69.53115844726562 42.296615600585994, 69.57532501220714 42.28984832763672,
-69.60591888427734 42.26734542846691, 69.64803314208996 42.285514831543026, 69.72393798828136 42.264495849609375,
-69.71796417236334 42.33912658691412, 69.67385864257812 42.345897674560604, 69.67630004882812 42.362247467041016,
-69.7154312133789 42.35989379882818, 69.66631317138683 42.408203125000114, 69.71104431152344 42.405490875244084,
-69.69738006591803 42.42692184448242, 69.64393615722662 42.44665908813488, 69.61659240722656 42.41533660888672,
-69.62030792236334 42.43984985351568, 69.58672332763678 42.44188690185547, 69.57182312011719 42.41804504394531,
-69.52764129638683 42.42483901977545, 69.50846862792969 42.37234115600586, 69.46366119384766 42.37501907348633,
-69.42977905273443 42.29850387573242))"""
-
-geom = wkt.loads(sh_wkt)
-if gdf.geom_type.unique().tolist() == ["MultiPolygon"] and isinstance(geom, Polygon):
-    geom = MultiPolygon([geom])
-
-row = {col: None for col in gdf.columns}
-for k, v in {
-    "shapeName": sh_name,
-    "shapeISO": sh_iso,
-    "shapeGroup": sh_grp,
-    "shapeType": sh_typ,
-    "shapeID": sh_id,
-    "geometry": geom,
-}.items():
-    if k in row:
-        row[k] = v
-
-new_gdf = gpd.GeoDataFrame([row], crs=gdf.crs)
-
-gdf = pd.concat([gdf, new_gdf], ignore_index=True)
-
-name_map = {
-    "г.Нур-Султан": "Astana",
-    "г.Шымкент": "Shymkent",
-    "г.Алматы": "Almaty",
-    "Алматинская": "Almaty Region",
-    "Жамбылская": "Jambyl Region",
-    "Западно-Казахстанская": "West Kazakhstan Region",
-    "Туркестанская": "South Kazakhstan Region",
-    "Южно-Казахстанская": "South Kazakhstan Region",
-    "Северо-Казахстанская": "North Kazakhstan Region",
-    "Костанайская": "Kostanay Region",
-    "Мангистауская": "Mangystau Region",
-    "Актюбинская": "Aktobe Region",
-    "Акмолинская": "Akmola Region",
-    "Атырауская": "Atyrau Region",
-    "Восточно-Казахстанская": "East Kazakhstan Region",
-    "Павлодарская": "Pavlodar Region",
-    "Кызылординская": "Kyzylorda Region",
-    "Карагандинская": "Karaganda Region",
-}
-
-le_long = (
-    pd.read_csv(CSV_LE)
-    .melt(
-        id_vars=["Region"],
-        value_vars=["2017", "2018", "2019", "2020", "2021"],
-        var_name="year",
-        value_name="life_expectancy",
-    )
-    .rename(columns={"Region": "region_en"})
-)
-le_long["year"] = le_long["year"].astype(int)
-YEARS = [2017, 2018, 2019, 2020, 2021]
+GEOMETRY_DIR = ARTIFACT_DIR
+PROFILE_DIR = DATA_DIR / "bench"  # not next to the page: docs/ is published
+CENTER = {"lat": 48.0, "lon": 67.0}
+ZOOM = 3.5
+# modules whose code shapes the shared objects and panel fragments; part of
+# every incremental cache key, so editing any of them rebuilds everything
+BUILD_MODULES = [
+    "export2html.py",
+    "aggregate.py",
+    "encode.py",
+    "geometry.py",
+    "indicators.py",
+    "life_exp.py",
+    "regions.py",
+    "seasons.py",
+]
 
 
-# ---------- helpers ----------
-def rolling_ci(series: pd.Series, win: int = 3):
-    m = series.rolling(window=win, min_periods=2, center=True).mean()
-    s = series.rolling(window=win, min_periods=2, center=True).std(ddof=1)
-    up = (m + 1.96 * s.fillna(0)).fillna(series + 0.05)
-    lo = (m - 1.96 * s.fillna(0)).fillna(series - 0.05)
-    return lo, up
+# ---------- inputs (loaded on first use, once per process) ----------
+@lru_cache(maxsize=None)
+def page_geometry() -> Geometry:
+    # the coarsest geometry level that stays sub-pixel at the page's zoom
+    return load_geometry(GEOMETRY_DIR, level=pick_level(ZOOM, "page"))
 
 
-def to_iso(s: pd.Series) -> list[str]:
-    return pd.to_datetime(s).dt.strftime("%Y-%m-%dT%H:%M:%S").tolist()
+@lru_cache(maxsize=None)
+def life_exp_table() -> LifeExpTable:
+    return load_life_exp(CSV_LE, default_regions())
 
 
-def life_exp_dict(le_df: pd.DataFrame):
-    out = {}
-    for reg, sub in le_df.groupby("region_en"):
-        arr = []
-        m = {int(r["year"]): r["life_expectancy"] for _, r in sub.iterrows()}
-        for y in YEARS:
-            v = m.get(y, None)
-            arr.append(None if (v is None or pd.isna(v)) else float(v))
-        out[reg] = arr
-    return out
+def shape_codes() -> np.ndarray:
+    # region code of each map location, in the order of the shared template
+    return page_geometry().regions["code"].to_numpy()
 
 
-LIFE_EXP_ALL = life_exp_dict(le_long)
-
-CENTER = {"lat": 48.0, "lon": 67.0}
-ZOOM = 3.5
-geojson_fixed = json.loads(gdf.to_json())
+def build_shared() -> dict:
+    """Objects identical across dashboards, emitted once per page."""
+    import plotly.express as px
 
+    geo, regions, le_table = page_geometry(), default_regions(), life_exp_table()
+    codes = shape_codes()
 
-def build_one_dashboard(
-    df_in: pd.DataFrame,
-    *,
-    score_col: str,
-    question_col: str,
-    mapping: dict,
-    title: str,
-    y_range: list[float],
-    slug: str,
-):
-    df = df_in.copy()
-    df[score_col] = df[question_col].map(mapping)
-
-    # aggregate for map
-    df_score = (
-        df[[score_col, "Область"]]
-        .groupby("Область", as_index=False)
-        .mean()
-        .sort_values(score_col)
+    # ---------- MAP (template without geometry or z) ----------
+    base = geo.regions[["shapeName"]].assign(
+        region_en=[regions.names[c] if c >= 0 else None for c in codes],
+        score=float("nan"),
     )
-    df_score["region_en"] = df_score["Область"].map(name_map)
-    merged = gdf.merge(df_score, left_on="shapeName", right_on="region_en", how="left")
-
-    # time series
-    df["date"] = pd.to_datetime(dict(year=df["Год"], month=df["Месяц"], day=1))
-    ts = (
-        df.groupby(["Область", "date"], as_index=False)[score_col]
-        .mean()
-        .sort_values(["Область", "date"])
-    )
-    ts["region_en"] = ts["Область"].map(name_map)
-
-    ts_dict = {}
-    for reg, sub in ts.groupby("region_en", dropna=False):
-        if pd.isna(reg):
-            continue
-        sub = sub.sort_values("date")
-        dates = to_iso(sub["date"])
-        vals = sub[score_col].astype(float)
-        lo, up = rolling_ci(vals, 3)
-        ts_dict[reg] = {
-            "dates": dates,
-            "values": [None if pd.isna(x) else float(x) for x in vals.tolist()],
-            "ci_lower": [None if pd.isna(x) else float(x) for x in lo.tolist()],
-            "ci_upper": [None if pd.isna(x) else float(x) for x in up.tolist()],
-        }
-
-    shape_to_en = merged.set_index("shapeName")["region_en"].to_dict()
-
-    # ---------- MAP ----------
     map_fig = px.choropleth_mapbox(
-        merged,
-        geojson=geojson_fixed,
+        base,
+        geojson=geo.geojson,
         locations="shapeName",
         featureidkey="properties.shapeName",
-        color=score_col,
+        color="score",
         hover_name="region_en",
         color_continuous_scale="YlGn",
         mapbox_style="carto-positron",
@@ -188,11 +102,17 @@ def build_one_dashboard(
         zoom=ZOOM,
         opacity=0.75,
     )
-    map_fig.update_traces(marker_line_width=0.5, marker_line_color="white")
+    map_fig.update_traces(
+        geojson=None,
+        z=None,
+        hovertemplate="<b>%{hovertext}</b><br><br>shapeName=%{location}<br>%{meta}=%{z}<extra></extra>",
+        marker_line_width=0.5,
+        marker_line_color="white",
+    )
     map_fig.update_layout(
         margin=dict(r=0, t=40, l=0, b=0),
         title=dict(
-            text=title,
+            text="",
             font=dict(
                 size=16, family="Arial", color="black"
             ),  # size, font family, color
@@ -232,7 +152,7 @@ def build_one_dashboard(
                 mode="lines",
                 line={"width": 2},
                 showlegend=False,
-                name=score_col,
+                name="score",
             ),
             go.Scatter(
                 x=[None],
@@ -284,7 +204,6 @@ def build_one_dashboard(
                 showline=True,
                 linewidth=1,
                 linecolor="black",
-                range=y_range,
             ),
             height=300,
             width=520,
@@ -324,100 +243,310 @@ def build_one_dashboard(
         ),
     )
 
+    return {
+        "map_spec": fig_json(map_fig),
+        "spark_spec": fig_json(spark_fig),
+        "table_spec": fig_json(table_fig),
+        "geojson": geo.geojson_text,
+        "life_exp": dumps(le_table.as_cells(len(regions))),
+        "years": dumps(le_table.years),
+        "regions": dumps(regions.names),
+        "codes": dumps(codes),
+    }
+
+
+def build_one_dashboard(
+    agg: Aggregates,
+    *,
+    score_col: str,
+    title: str,
+    y_range: list[float],
+    slug: str,
+):
+    # map values, in the order of the shared template's locations
+    regions = default_regions()
+    z = regions.dense(agg.regional[score_col])[shape_codes()]
+
+    # time series: per region, month indices into the shared axis plus values
+    series = agg.monthly[score_col]
+    months = month_index(series.index.get_level_values("date"))
+    values = series.to_numpy(dtype=float)
+    ci_lower = agg.ci_lower[score_col].to_numpy(dtype=float)
+    ci_upper = agg.ci_upper[score_col].to_numpy(dtype=float)
+    ts_dict = [None] * len(regions)  # indexed by region code
+    for code, sl in region_slices(series.index):
+        ts_dict[code] = series_payload(
+            months[sl], values[sl], ci_lower[sl], ci_upper[sl]
+        )
+
+    # month x region-code table, one pivot: the page derives the map animation
+    # frames (through CODES) and the small-multiples overview from it
+    monthly_dates, monthly = month_frames(series, np.arange(len(regions)))
+    monthly_data = {
+        "m0": int(month_index(monthly_dates[:1])[0]) if len(monthly_dates) else 0,
+        "v": typed_array(monthly),
+    }
+
+    # only the per-indicator values; geometry and layout live in SHARED
+    map_data = {
+        "z": typed_array(z),
+        "label": score_col,
+        "title": title,
+    }
+
     return {
         "slug": slug,
-        "map_spec": pio.to_json(map_fig, validate=False),
-        "spark_spec": pio.to_json(spark_fig, validate=False),
-        "table_spec": pio.to_json(table_fig, validate=False),
-        "ts_data": json.dumps(ts_dict, ensure_ascii=False),
-        "life_exp": json.dumps(LIFE_EXP_ALL, ensure_ascii=False),
-        "years": json.dumps(YEARS),
-        "shape_to_en": json.dumps(shape_to_en, ensure_ascii=False),
-        "y_range": json.dumps(y_range),
+        "map": dumps(map_data),
+        "ts_data": dumps(ts_dict),
+        "monthly": dumps(monthly_data),
+        "y_range": dumps(y_range),
+        "months": [int(months.min()), int(months.max())] if len(months) else None,
     }
 
 
-# ---------- build 4 dashboards ----------
-dashboards = [
-    build_one_dashboard(
-        df_base,
-        score_col="eco_score",
-        question_col="q8. Оцените, пожалуйста, экологическую ситуацию в Вашем населенном пункте",
-        mapping={"Плохая": 0, "Удовлетворительная": 1, "Хорошая": 2},
-        title="Rate the environmental situation in your locality (2017–2021)",
-        y_range=[0.0, 2.0],
-        slug="eco",
-    ),
-    build_one_dashboard(
-        df_base,
-        score_col="health_score",
-        question_col="q10a. В целом как бы Вы оценили свое здоровье в настоящее время?",
-        mapping={
-            "Ужасное": 0,
-            "Плохое": 1,
-            "Удовлетворительное": 2,
-            "Хорошее": 3,
-            "Прекрасное": 4,
-        },
-        title="In general, how would you rate your health at present? (2017–2021)",
-        y_range=[0.0, 4.0],
-        slug="health",
-    ),
-    build_one_dashboard(
-        df_base,
-        score_col="gov_med_score",
-        question_col="q9.1. Оцените, пожалуйста, качество медицинских услуг в государственных медицинских учреждениях (поликлиники, больницы) в Казахстане",
-        mapping={"Плохое": 1, "Удовлетворительное": 2, "Хорошее": 3},
-        title="Please rate the quality of medical services in state clinics (2017–2021)",
-        y_range=[1.0, 3.0],
-        slug="govmed",
-    ),
-    build_one_dashboard(
-        df_base,
-        score_col="priv_med_score",
-        question_col="q9.2. Оцените, пожалуйста, качество медицинских услуг в  частных клиниках в Казахстане",
-        mapping={"Плохое": 1, "Удовлетворительное": 2, "Хорошее": 3},
-        title="Please rate the quality of medical services in private clinics (2017–2021)",
-        y_range=[1.0, 3.0],
-        slug="privmed",
-    ),
-]
+def build_from(agg: Aggregates, ind: dict) -> dict:
+    return build_one_dashboard(
+        agg,
+        score_col=ind["score_col"],
+        title=ind["title"],
+        y_range=ind["y_range"],
+        slug=ind["slug"],
+    )
+
+
+def build_many(
+    agg: Aggregates, indicators: list[dict], timer: StageTimer | None = None
+) -> list[dict]:
+    # a panel is a few ms of slicing and encoding once the cube is aggregated
+    timer = timer or StageTimer(enabled=False)
+    return [timer.timed(ind["slug"], build_from, agg, ind) for ind in indicators]
+
+
+# ---------- aggregates ----------
+def update_store(
+    indicators: list[dict],
+    chunksize: int | None = None,
+    store: CubeStore | None = None,
+    survey: Path | None = CSV_SURVEY,
+) -> tuple[CubeStore, list[dict]]:
+    """Bring the cube store up to date; returns it and the indicators scanned.
+
+    survey is merged as a wave when the file exists. Without it the build
+    runs from the cells already in the store, and only cells the store
+    lacks are scanned; chunked reading keeps memory flat.
+    """
+    store = store or CubeStore()
+    scanned = []
+    if survey is not None and Path(survey).exists():
+        scanned = store.merge_wave(survey, indicators, chunksize=chunksize)
+    for ind in store.update(indicators, chunksize):
+        if ind not in scanned:
+            scanned.append(ind)
+    if not store.waves:
+        raise FileNotFoundError(f"{survey} not found and {store.root} holds no waves")
+    return store, scanned
+
+
+def store_aggregates(store: CubeStore, indicators: list[dict]) -> Aggregates:
+    cube = rekey_regions(store.cube(indicators), default_regions())
+    return aggregates_from_cube(cube)
+
+
+# ---------- incremental build ----------
+def build_incremental(
+    indicators: list[dict],
+    cache: BuildCache | None = None,
+    chunksize: int | None = None,
+    store: CubeStore | None = None,
+    survey: Path | None = CSV_SURVEY,
+    timer: StageTimer | None = None,
+):
+    """Rebuild only panels whose inputs changed; scan only cells the store lacks."""
+    cache = cache or BuildCache()
+    timer = timer or StageTimer(enabled=False)
+    with timer.stage("store"):
+        store, scanned = update_store(indicators, chunksize, store, survey)
+    code_sha = fingerprint(
+        *(file_sha256(Path(__file__).with_name(m)) for m in BUILD_MODULES)
+    )
+    le_sha = file_sha256(CSV_LE)
+
+    regions_sha = file_sha256(REGIONS_PATH)
+    geo_sha = page_geometry().sha256
+    shared_key = fingerprint(geo_sha, le_sha, regions_sha, code_sha)
+    shared = cache.load_fragment("_shared", shared_key)
+    if shared is None:
+        with timer.stage("shared"):
+            shared = build_shared()
+        cache.save_fragment("_shared", shared_key, shared)
+
+    frag_keys, fragments = {}, {}
+    for ind in indicators:
+        slug = ind["slug"]
+        frag_keys[slug] = fingerprint(
+            store.signature(),
+            indicator_key(ind),
+            ind["score_col"],
+            regions_sha,
+            ind["title"],
+            ind["y_range"],
+            slug,
+            geo_sha,
+            le_sha,
+            code_sha,
+        )
+        fragments[slug] = cache.load_fragment(slug, frag_keys[slug])
+
+    stale = [ind for ind in indicators if fragments[ind["slug"]] is None]
+    if stale:
+        with timer.stage("aggregate"):
+            agg = store_aggregates(store, stale)
+        with timer.stage("dashboards"):
+            built = build_many(agg, stale, timer)
+        for ind, fragment in zip(stale, built):
+            fragments[ind["slug"]] = fragment
+            cache.save_fragment(ind["slug"], frag_keys[ind["slug"]], fragment)
+    cache.save()
+
+    print(
+        f"Rebuilt {len(stale)}/{len(indicators)} panels "
+        f"({len(scanned)} re-aggregated)"
+    )
+    return shared, [fragments[ind["slug"]] for ind in indicators]
 
 
 # ---------- HTML (layout 1×4) ----------
-def block_html(slug: str) -> str:
+def block_html(slug: str, overview: bool = False) -> str:
+    classes = "dash with-overview" if overview else "dash"
+    below = (
+        f'\n    <div class="overview" id="overviewDiv_{slug}"></div>'
+        if overview
+        else ""
+    )
     return f"""
-  <section class="dash">
+  <section class="{classes}" data-slug="{slug}">
     <div class="map" id="mapDiv_{slug}"></div>
     <div class="right">
-      <div id="sparkDiv_{slug}"></div>
+      <div id="sparkDiv_{slug}" class="hint">Click on the region</div>
       <div id="tableDiv_{slug}"></div>
-    </div>
+    </div>{below}
   </section>
 """
 
 
-dash_html = "\n".join(block_html(d["slug"]) for d in dashboards)
+def shared_literal(shared: dict) -> str:
+    return (
+        "{"
+        f'"GEOJSON": {shared["geojson"]}, '
+        f'"MAP_SPEC": {shared["map_spec"]}, '
+        f'"SPARK_SPEC": {shared["spark_spec"]}, '
+        f'"TABLE_SPEC": {shared["table_spec"]}, '
+        f'"LIFE_EXP": {shared["life_exp"]}, '
+        f'"YEARS": {shared["years"]}, '
+        f'"REGIONS": {shared["regions"]}, '
+        f'"CODES": {shared["codes"]}, '
+        f'"MONTH0": {shared["month0"]}, '
+        f'"MONTHS": {shared["months"]}, '
+        f'"SEASONS": {shared["seasons"]}, '
+        f'"SERVICE": {shared["service"]}, '
+        f'"ANIMATE": {shared["animate"]}, '
+        f'"OVERVIEW": {shared["overview"]}'
+        "}"
+    )
+
 
-js_array_items = []
-for d in dashboards:
-    js_obj = (
+def dash_literal(d: dict, service: str | None = None, monthly: bool = False) -> str:
+    # with a data service, region series are fetched on click instead
+    if service:
+        url = f"{service}/series/{d['slug']}/"
+        series = f'"SERIES_URL": {json.dumps(url)}'
+    else:
+        series = f'"TS_DATA": {d["ts_data"]}'
+    monthly = f'"MONTHLY": {d["monthly"]}, ' if monthly else ""
+    return (
         "{"
-        f"slug: {json.dumps(d['slug'])}, "
-        f"MAP_SPEC: {d['map_spec']}, "
-        f"SPARK_SPEC: {d['spark_spec']}, "
-        f"TABLE_SPEC: {d['table_spec']}, "
-        f"TS_DATA: {d['ts_data']}, "
-        f"LIFE_EXP: {d['life_exp']}, "
-        f"YEARS: {d['years']}, "
-        f"SHAPE_TO_EN: {d['shape_to_en']}, "
-        f"YRANGE: {d['y_range']}"
+        f'"slug": {json.dumps(d["slug"])}, '
+        f'"MAP": {d["map"]}, '
+        f"{monthly}"
+        f"{series}, "
+        f'"YRANGE": {d["y_range"]}'
         "}"
     )
-    js_array_items.append(js_obj)
-dash_js_literal = ",\n  ".join(js_array_items)
 
-page = f"""<!DOCTYPE html>
+
+# ---------- sidecars ----------
+def write_gz(path: Path, text: str):
+    # mtime=0 keeps the bytes stable between identical builds
+    path.write_bytes(gzip.compress(text.encode("utf-8"), mtime=0))
+
+
+def write_sidecars(
+    dashboards: list[dict], out_html: Path, monthly: bool = False
+) -> list[str]:
+    """Write one panel file and one time-series file per dashboard next to the page."""
+    rel_dir = f"{out_html.stem}_data"
+    out_dir = out_html.parent / rel_dir
+    out_dir.mkdir(parents=True, exist_ok=True)
+    items = []
+    for d in dashboards:
+        slug = d["slug"]
+        extra = f'"MONTHLY": {d["monthly"]}, ' if monthly else ""
+        write_gz(
+            out_dir / f"{slug}.json.gz",
+            f'{{"MAP": {d["map"]}, {extra}"YRANGE": {d["y_range"]}}}',
+        )
+        write_gz(out_dir / f"{slug}.ts.json.gz", d["ts_data"])
+        items.append(
+            "{"
+            f'"slug": {json.dumps(slug)}, '
+            f'"URL": {json.dumps(f"{rel_dir}/{slug}.json.gz")}, '
+            f'"TS_URL": {json.dumps(f"{rel_dir}/{slug}.ts.json.gz")}'
+            "}"
+        )
+    return items
+
+
+def month_range(dashboards: list[dict]) -> tuple[int, int] | None:
+    # the union of every panel's months, as month indices
+    ranges = [d["months"] for d in dashboards if d.get("months")]
+    if not ranges:
+        return None
+    return min(r[0] for r in ranges), max(r[1] for r in ranges)
+
+
+def seasons_literal(span: tuple[int, int] | None) -> str:
+    # one background trace for every panel, spanning all indicators' months
+    if span is None:
+        return "null"
+    axis = month_axis(*span)
+    return dumps(go.Bar(season_bands(axis[0], axis[-1])).to_plotly_json())
+
+
+def render_page(
+    shared: dict,
+    dashboards: list[dict],
+    js_items: list[str],
+    service: str | None = None,
+    animate: bool = False,
+    overview: bool = False,
+) -> str:
+    span = month_range(dashboards)
+    shared = {
+        **shared,
+        "seasons": seasons_literal(span),
+        "month0": dumps(span[0] if span else 0),
+        "months": dumps(month_axis(*span) if span else []),
+        "service": dumps(service),
+        "animate": dumps(animate),
+        "overview": dumps(overview),
+    }
+    if service:
+        shared["life_exp"] = "null"  # rows come from the service too
+    dash_html = "\n".join(block_html(d["slug"], overview) for d in dashboards)
+    shared_js_literal = shared_literal(shared)
+    dash_js_literal = ",\n  ".join(js_items)
+
+    return f"""<!DOCTYPE html>
 <html lang="en">
 <head>
 <meta charset="UTF-8" />
@@ -436,6 +565,9 @@ page = f"""<!DOCTYPE html>
   .map {{ flex:1; min-height:600px; }}
   .right {{ width:560px; display:flex; flex-direction:column; gap:8px; }}
   .title {{ padding: 8px 14px; font-weight:600; color:#333; }}
+  .hint {{ padding: 40px 30px; color:#888; }}
+  .dash.with-overview {{ flex-wrap: wrap; }}
+  .overview {{ flex-basis: 100%; min-height: 300px; }}
 </style>
 </head>
 <body>
@@ -445,73 +577,252 @@ page = f"""<!DOCTYPE html>
 </div>
 
 <script>
-function parseMaybe(x) {{
-  if (typeof x === 'string') {{ try {{ return JSON.parse(x); }} catch (e) {{ return null; }} }}
-  return x;
+// sidecars are gzip files; decompress unless the server already did
+async function fetchJSON(url) {{
+  const res = await fetch(url);
+  if (!res.ok) throw new Error(url + ": HTTP " + res.status);
+  const buf = new Uint8Array(await res.arrayBuffer());
+  if (buf[0] === 0x1f && buf[1] === 0x8b) {{
+    const stream = new Blob([buf]).stream().pipeThrough(new DecompressionStream("gzip"));
+    return new Response(stream).json();
+  }}
+  return JSON.parse(new TextDecoder().decode(buf));
 }}
-function seasonColor(m) {{
-  if (m===12 || m===1 || m===2) return "rgba(0,0,255,0.10)";
-  if (m===3 || m===4 || m===5) return "rgba(0,128,0,0.10)";
-  if (m===6 || m===7 || m===8) return "rgba(255,0,0,0.10)";
-  return "rgba(255,215,0,0.10)";
+// numeric arrays travel as plotly.js typed-array specs {{dtype, bdata}}
+const DTYPES = {{f4: Float32Array, f8: Float64Array, i2: Int16Array, i4: Int32Array}};
+function decode(a) {{
+  if (!a || !a.bdata) return a;
+  const bin = atob(a.bdata), bytes = new Uint8Array(bin.length);
+  for (let i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i);
+  return new DTYPES[a.dtype](bytes.buffer);
 }}
-function monthlyBands(xStart, xEnd) {{
-  const shapes = [];
-  let cur = new Date(xStart), end = new Date(xEnd);
-  while (cur <= end) {{
-    const m = cur.getMonth()+1;
-    const x0 = new Date(cur.getFullYear(), cur.getMonth(), 1).toISOString().slice(0,10);
-    const x1 = new Date(cur.getFullYear(), cur.getMonth()+1, 1).toISOString().slice(0,10);
-    shapes.push({{ type:"rect", xref:"x", x0, x1, yref:"paper", y0:0, y1:1, line:{{width:0}}, layer:"below", fillcolor:seasonColor(m) }});
-    cur = new Date(cur.getFullYear(), cur.getMonth()+1, 1);
+function regionSeries(ts) {{
+  if (!ts.x) {{
+    ts.x = Array.from(decode(ts.m), k => SHARED.MONTHS[k - SHARED.MONTH0]);
+    ts.y = [decode(ts.hi), decode(ts.lo), decode(ts.v)];
   }}
-  return shapes;
+  return ts;
+}}
+function loadTS(D) {{
+  if (D.TS_DATA) return Promise.resolve(D.TS_DATA);
+  if (!D._tsPromise) D._tsPromise = fetchJSON(D.TS_URL).then(ts => (D.TS_DATA = ts));
+  return D._tsPromise;
 }}
-function fmtVal(v) {{ return (v==null || Number.isNaN(v)) ? "—" : Number(v).toFixed(1); }}
+// with a data service, one region at a time; the browser revalidates by ETag
+const missing = () => null;
+function loadSeries(D, code) {{
+  if (!D.SERIES_URL) return loadTS(D).then(ts => ts && ts[code]);
+  D._series = D._series || {{}};
+  if (!D._series[code]) D._series[code] = fetchJSON(D.SERIES_URL + code).catch(missing);
+  return D._series[code];
+}}
+const LE_ROWS = {{}};
+function loadLifeExp(code) {{
+  if (!SHARED.SERVICE) return Promise.resolve(SHARED.LIFE_EXP[code]);
+  if (!LE_ROWS[code]) {{
+    LE_ROWS[code] = fetchJSON(SHARED.SERVICE + "/life_exp/" + code).then(r => r.values, missing);
+  }}
+  return LE_ROWS[code];
+}}
+
+const SHARED = {shared_js_literal};
 
 const DASHES = [
   {dash_js_literal}
 ];
 
+function mapFigure(D) {{
+  const base = SHARED.MAP_SPEC;
+  const trace = Object.assign({{}}, base.data[0], {{z: decode(D.MAP.z), meta: D.MAP.label, geojson: SHARED.GEOJSON}});
+  const layout = structuredClone(base.layout);
+  layout.title.text = D.MAP.title;
+  layout.coloraxis.colorbar.title.text = D.MAP.label;
+  return {{data: [trace], layout}};
+}}
+function sparkFigure(D) {{
+  const spec = structuredClone(SHARED.SPARK_SPEC);
+  spec.data[2].name = D.MAP.label;
+  spec.layout.yaxis.range = D.YRANGE;
+  if (SHARED.SEASONS) {{
+    const bands = Object.assign({{}}, SHARED.SEASONS);
+    bands.base = D.YRANGE[0];
+    bands.y = bands.x.map(() => D.YRANGE[1] - D.YRANGE[0]);
+    spec.data.push(bands);
+  }}
+  return spec;
+}}
+
+// month x region-code values, shared by the map animation and the overview
+function monthlyValues(D) {{
+  if (!D._monthly) D._monthly = decode(D.MONTHLY.v);
+  return D._monthly;
+}}
+const monthLabel = (D, i) => SHARED.MONTHS[D.MONTHLY.m0 + i - SHARED.MONTH0].slice(0, 7);
+
+// month frames restyle z only: geometry, colorscale and layout stay put
+function animateMap(D, M) {{
+  const n = SHARED.REGIONS.length, v = monthlyValues(D), months = v.length / n;
+  let lo = Infinity, hi = -Infinity;
+  for (const x of v) if (x === x) {{ lo = Math.min(lo, x); hi = Math.max(hi, x); }}
+  const years = [SHARED.MONTHS[0], SHARED.MONTHS[SHARED.MONTHS.length - 1]].map(m => m.slice(0, 4));
+  const frames = [{{name: years.join("–"), data: [{{z: M.data[0].z}}], traces: [0]}}];  // pooled
+  for (let i = 0; i < months; i++) {{
+    const z = Float32Array.from(SHARED.CODES, c => (c < 0 ? NaN : v[i * n + c]));
+    frames.push({{name: monthLabel(D, i), data: [{{z}}], traces: [0]}});
+  }}
+  const go = (names, duration) => [names, {{
+    mode: "immediate", fromcurrent: true,
+    frame: {{duration, redraw: true}}, transition: {{duration: 0}},
+  }}];
+  const L = M.layout;
+  if (lo <= hi) Object.assign(L.coloraxis, {{cmin: lo, cmax: hi}});  // one scale for every month
+  L.sliders = [{{
+    active: 0, pad: {{t: 10}}, currentvalue: {{prefix: ""}},
+    steps: frames.map(f => ({{label: f.name, method: "animate", args: go([f.name], 0)}})),
+  }}];
+  L.updatemenus = [{{
+    type: "buttons", showactive: false, direction: "left",
+    x: 0, y: 0, xanchor: "left", yanchor: "top", pad: {{t: 60}},
+    buttons: [
+      {{label: "▶", method: "animate", args: go(null, 400)}},
+      {{label: "❚❚", method: "animate", args: [[null], {{mode: "immediate", frame: {{duration: 0}}}}]}},
+    ],
+  }}];
+  L.margin = Object.assign({{}}, L.margin, {{b: 90}});
+  return frames;
+}}
+
+// every region's series in one scattergl trace: a grid of cells, null between regions
+const OVERVIEW_COLS = 6, OVERVIEW_GAP = 4, OVERVIEW_ROW = 1.4;
+function overviewFigure(D) {{
+  const n = SHARED.REGIONS.length, v = monthlyValues(D), months = v.length / n;
+  const [y0, y1] = D.YRANGE;
+  const x = [], y = [], text = [], annotations = [], shapes = [];
+  let k = 0;
+  for (let c = 0; c < n; c++) {{
+    let seen = false;
+    for (let i = 0; i < months && !seen; i++) seen = v[i * n + c] === v[i * n + c];
+    if (!seen) continue;
+    const dx = (k % OVERVIEW_COLS) * (months + OVERVIEW_GAP);
+    const dy = -Math.floor(k / OVERVIEW_COLS) * OVERVIEW_ROW;
+    k++;
+    for (let i = 0; i < months; i++) {{
+      const val = v[i * n + c];
+      x.push(dx + i);
+      y.push(dy + (val - y0) / (y1 - y0));
+      text.push(SHARED.REGIONS[c] + "<br>" + monthLabel(D, i) + ": " + (val === val ? val.toFixed(2) : "—"));
+    }}
+    x.push(null); y.push(null); text.push("");
+    shapes.push({{type: "rect", layer: "below", x0: dx - 0.5, x1: dx + months - 0.5, y0: dy, y1: dy + 1,
+                 line: {{width: 0.5, color: "#ccc"}}}});
+    annotations.push({{x: dx, y: dy + 1, text: SHARED.REGIONS[c], showarrow: false,
+                      xanchor: "left", yanchor: "bottom", font: {{size: 10}}}});
+  }}
+  const rows = Math.ceil(k / OVERVIEW_COLS);
+  return {{
+    data: [{{type: "scattergl", mode: "lines", x, y, text, hovertemplate: "%{{text}}<extra></extra>",
+             line: {{width: 1.5, color: "#2c7fb8"}}}}],
+    layout: {{
+      title: {{text: "All regions, month by month", font: {{size: 13}}}},
+      height: 80 + rows * 110, margin: {{l: 10, r: 10, t: 40, b: 10}}, showlegend: false,
+      xaxis: {{visible: false}}, yaxis: {{visible: false, range: [1.25 - rows * OVERVIEW_ROW, 1.3]}},
+      annotations, shapes,
+    }},
+  }};
+}}
+
+function renderOverview(D) {{
+  const F = overviewFigure(D);
+  Plotly.newPlot("overviewDiv_"+D.slug, F.data, F.layout, {{displayModeBar:false, responsive:true}});
+}}
+
+function renderMap(D) {{
+  if (D._rendered) return;
+  D._rendered = true;
+  const M = mapFigure(D);
+  const frames = SHARED.ANIMATE && D.MONTHLY && animateMap(D, M);
+  Plotly.newPlot("mapDiv_"+D.slug, M.data, M.layout, {{responsive:true}})
+    .then(gd => frames && Plotly.addFrames(gd, frames));
+  if (SHARED.OVERVIEW && D.MONTHLY) whenIdle(() => renderOverview(D), {{timeout: 2000}});
+  document.getElementById("mapDiv_"+D.slug).on("plotly_click", evt => showRegion(D, evt));
+}}
+
+async function showRegion(D, evt) {{
+  if (!evt.points || !evt.points.length) return;
+  const code = SHARED.CODES[evt.points[0].pointNumber];
+  D._clicked = code;
+  const [series, leRow] = await Promise.all([loadSeries(D, code), loadLifeExp(code)]);
+  if (!series || D._clicked !== code) return;  // no data, or a later click won
+
+  const ts = regionSeries(series);
+  const le = leRow || SHARED.YEARS.map(() => "—");
+  const sparkId = "sparkDiv_"+D.slug, tableId = "tableDiv_"+D.slug;
+  if (!D._panels) {{
+    // sparkline and table are only built on the first click, already filled in
+    D._panels = true;
+    const S = sparkFigure(D), T = structuredClone(SHARED.TABLE_SPEC);
+    for (let i = 0; i < 3; i++) {{ S.data[i].x = ts.x; S.data[i].y = ts.y[i]; }}
+    S.layout.title = Object.assign({{}}, S.layout.title, {{text: SHARED.REGIONS[code]}});
+    T.data[0].cells.values = [SHARED.YEARS, le];
+    for (const id of [sparkId, tableId]) {{
+      const el = document.getElementById(id);
+      el.textContent = "";
+      el.classList.remove("hint");
+    }}
+    Plotly.newPlot(sparkId, S.data, S.layout, {{displayModeBar:false, responsive:true}});
+    Plotly.newPlot(tableId, T.data, T.layout, {{displayModeBar:false, responsive:true}});
+    return;
+  }}
+  Plotly.update(sparkId,
+    {{ x:[ts.x, ts.x, ts.x], y:ts.y }},
+    {{"yaxis.range": D.YRANGE, "title.text": SHARED.REGIONS[code]}}, [0,1,2]
+  );
+  Plotly.restyle(tableId, {{"cells.values": [[SHARED.YEARS, le]]}}, [0]);
+}}
+
+function renderLazy(D) {{
+  if (D._loading) return;
+  D._loading = fetchJSON(D.URL).then(panel => {{ Object.assign(D, panel); renderMap(D); }});
+}}
+
+function renderPanel(D) {{
+  if (D.URL) renderLazy(D); else renderMap(D);
+}}
+
+const whenIdle = window.requestIdleCallback
+  || (fn => setTimeout(() => fn({{didTimeout: true, timeRemaining: () => 0}}), 50));
+
 document.addEventListener('DOMContentLoaded', () => {{
-  for (const D_raw of DASHES) {{
-    const D = {{}};
-    D.slug = D_raw.slug;
-    D.MAP_SPEC   = parseMaybe(D_raw.MAP_SPEC);
-    D.SPARK_SPEC = parseMaybe(D_raw.SPARK_SPEC);
-    D.TABLE_SPEC = parseMaybe(D_raw.TABLE_SPEC);
-    D.TS_DATA    = parseMaybe(D_raw.TS_DATA);
-    D.LIFE_EXP   = parseMaybe(D_raw.LIFE_EXP);
-    D.YEARS      = parseMaybe(D_raw.YEARS);
-    D.SHAPE_TO_EN= parseMaybe(D_raw.SHAPE_TO_EN);
-    D.YRANGE     = parseMaybe(D_raw.YRANGE);
-
-    Plotly.newPlot("mapDiv_"+D.slug,   D.MAP_SPEC.data,   D.MAP_SPEC.layout,   {{responsive:true}});
-    Plotly.newPlot("sparkDiv_"+D.slug, D.SPARK_SPEC.data, D.SPARK_SPEC.layout, {{displayModeBar:false, responsive:true}});
-    Plotly.newPlot("tableDiv_"+D.slug, D.TABLE_SPEC.data, D.TABLE_SPEC.layout, {{displayModeBar:false, responsive:true}});
-
-    Plotly.relayout("sparkDiv_"+D.slug, {{
-      "shapes": monthlyBands("2017-01-01","2021-05-31"),
-      "yaxis.range": D.YRANGE
-    }});
-
-    document.getElementById("mapDiv_"+D.slug).on("plotly_click", function(evt) {{
-      if (!evt.points || !evt.points.length) return;
-      const shapeName = evt.points[0].location;
-      const regionEn  = (D.SHAPE_TO_EN && D.SHAPE_TO_EN[shapeName]) ? D.SHAPE_TO_EN[shapeName] : shapeName;
-      if (!D.TS_DATA || !(regionEn in D.TS_DATA)) return;
-
-      const ts = D.TS_DATA[regionEn];
-      Plotly.update("sparkDiv_"+D.slug,
-        {{ x:[ts.dates, ts.dates, ts.dates], y:[ts.ci_upper, ts.ci_lower, ts.values] }},
-        {{}}, [0,1,2]
-      );
-      Plotly.relayout("sparkDiv_"+D.slug, {{"yaxis.range": D.YRANGE, "title.text": regionEn}});
-
-      const le = (D.LIFE_EXP && (regionEn in D.LIFE_EXP)) ? D.LIFE_EXP[regionEn] : new Array(D.YEARS.length).fill(null);
-      Plotly.restyle("tableDiv_"+D.slug, {{"cells.values": [[D.YEARS, le.map(fmtVal)]]}}, [0]);
-    }});
+  if (!DASHES.length) return;
+  const bySlug = Object.fromEntries(DASHES.map(D => [D.slug, D]));
+  const section = D => document.getElementById("mapDiv_"+D.slug).parentElement;
+
+  // the first map right away; the rest as they near the viewport or when idle
+  renderPanel(DASHES[0]);
+  const rest = DASHES.slice(1);
+  let io = null;
+  if ("IntersectionObserver" in window) {{
+    io = new IntersectionObserver((entries) => {{
+      for (const e of entries) {{
+        if (!e.isIntersecting) continue;
+        io.unobserve(e.target);
+        renderPanel(bySlug[e.target.dataset.slug]);
+      }}
+    }}, {{rootMargin: "200px 0px"}});
+    for (const D of rest) io.observe(section(D));
   }}
+
+  // inline panels also fill in one per idle slice; sidecars wait to be seen
+  const queue = io ? rest.filter(D => !D.URL) : rest;
+  (function next() {{
+    const D = queue.shift();
+    if (!D) return;
+    whenIdle(() => {{
+      if (io) io.unobserve(section(D));
+      renderPanel(D);
+      next();
+    }}, {{timeout: 2000}});
+  }})();
 }});
 </script>
 <script type="module" src="assets/header-footer.js"></script>
@@ -519,5 +830,184 @@ document.addEventListener('DOMContentLoaded', () => {{
 </html>
 """
 
-OUT_HTML.write_text(page, encoding="utf-8")
-print(f"Saved: {OUT_HTML.resolve()}")
+
+# ---------- export ----------
+def export(
+    out: Path = OUT_HTML,
+    indicators: list[dict] | None = None,
+    *,
+    survey: Path | None = CSV_SURVEY,
+    store: Path = CUBE_DIR,
+    sidecars: bool = False,
+    incremental: bool = False,
+    chunksize: int | None = None,
+    service: str | None = None,
+    animate: bool = False,
+    overview: bool = False,
+    timer: StageTimer | None = None,
+) -> Path:
+    """Build the dashboard page at out; what main() runs, minus the CLI.
+
+    survey is merged into the cube store at store first (see update_store).
+    """
+    indicators = indicators or load_indicators()
+    timer = timer or StageTimer(enabled=False)
+    out = Path(out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+
+    if incremental:
+        shared, dashboards = build_incremental(
+            indicators,
+            chunksize=chunksize,
+            store=CubeStore(store),
+            survey=survey,
+            timer=timer,
+        )
+    else:
+        with timer.stage("store"):
+            store, _ = update_store(indicators, chunksize, CubeStore(store), survey)
+        with timer.stage("aggregate"):
+            agg_all = store_aggregates(store, indicators)
+        with timer.stage("shared"):
+            shared = build_shared()
+        with timer.stage("dashboards"):
+            dashboards = build_many(agg_all, indicators, timer)
+
+    with timer.stage("sidecars" if sidecars else "literals"):
+        monthly = animate or overview
+        if sidecars:
+            js_items = write_sidecars(dashboards, out, monthly)
+        else:
+            js_items = [dash_literal(d, service, monthly) for d in dashboards]
+
+    with timer.stage("html"):
+        html = render_page(shared, dashboards, js_items, service, animate, overview)
+        out.write_text(html, encoding="utf-8")
+    return out
+
+
+# ---------- profiling ----------
+def write_profile(timer: StageTimer, args) -> Path:
+    report = {
+        "output": str(args.out),
+        "argv": sys.argv[1:],
+        "incremental": args.incremental,
+        **timer.report(),
+    }
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    if args.profile_dump:
+        prof_path = PROFILE_DIR / f"{args.out.stem}.prof"
+        stage = timer.dump_slowest(prof_path)
+        report["cprofile"] = {"stage": stage, "file": str(prof_path) if stage else None}
+
+    path = PROFILE_DIR / f"{args.out.stem}.profile.json"
+    path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print(timer.table())
+    print(f"Profile: {path.resolve()}")
+    return path
+
+
+# ---------- payload budgets ----------
+def check_budgets(out: Path, budgets: Path) -> bool:
+    rows = budget.analyze(out)
+    over = budget.check(rows, budget.load_budgets(budgets))
+    budget.report(rows, over)
+    return not over
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Export the survey dashboards to HTML.")
+    ap.add_argument("--out", type=Path, default=OUT_HTML)
+    ap.add_argument("--indicators", type=Path, default=REGISTRY_PATH)
+    ap.add_argument(
+        "--survey",
+        type=Path,
+        default=CSV_SURVEY,
+        help="survey CSV merged into the cube store first, if it exists",
+    )
+    ap.add_argument("--store", type=Path, default=CUBE_DIR, help="cube store directory")
+    data_mode = ap.add_mutually_exclusive_group()
+    data_mode.add_argument(
+        "--sidecars",
+        action="store_true",
+        help="write per-dashboard data to gzipped JSON next to the page and "
+        "load it as panels scroll into view (needs to be served over HTTP)",
+    )
+    data_mode.add_argument(
+        "--service",
+        metavar="URL",
+        default=None,
+        help="leave region series and life expectancy out of the page and "
+        "fetch them on click from a running scripts/serve.py at URL",
+    )
+    ap.add_argument(
+        "--animate",
+        action="store_true",
+        help="add a month slider and play button to every map; each frame "
+        "carries only that month's z values",
+    )
+    ap.add_argument(
+        "--overview",
+        action="store_true",
+        help="add a small-multiples panel under every map: all regions' "
+        "monthly series in one WebGL trace",
+    )
+    ap.add_argument(
+        "--incremental",
+        action="store_true",
+        help="reuse cached aggregates and panels whose inputs did not change",
+    )
+    ap.add_argument(
+        "--chunksize",
+        type=int,
+        default=None,
+        help="stream survey waves in chunks of this many rows when adding "
+        "them to the cube store (same output, bounded memory)",
+    )
+    ap.add_argument(
+        "--profile",
+        action="store_true",
+        help="record wall/CPU time and peak RSS per stage and per dashboard "
+        "in data/bench/<page>.profile.json",
+    )
+    ap.add_argument(
+        "--profile-dump",
+        action="store_true",
+        help="with --profile, run each stage under cProfile and save the "
+        "slowest one to data/bench/<page>.prof (adds overhead to the timings)",
+    )
+    ap.add_argument(
+        "--budgets",
+        type=Path,
+        default=None,
+        help="check the page (and sidecars) against these size budgets "
+        "(e.g. scripts/budgets.json) and exit 1 when one is exceeded",
+    )
+    args = ap.parse_args(argv)
+    timer = StageTimer(
+        enabled=args.profile or args.profile_dump, profile=args.profile_dump
+    )
+
+    export(
+        args.out,
+        load_indicators(args.indicators),
+        survey=args.survey,
+        store=args.store,
+        sidecars=args.sidecars,
+        incremental=args.incremental,
+        chunksize=args.chunksize,
+        service=args.service.rstrip("/") if args.service else None,
+        animate=args.animate,
+        overview=args.overview,
+        timer=timer,
+    )
+    print(f"Saved: {args.out.resolve()}")
+
+    if timer.enabled:
+        write_profile(timer, args)
+    if args.budgets and not check_budgets(args.out, args.budgets):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+import argparse
+import hashlib
+import json
+from dataclasses import dataclass, field
+from functools import cached_property
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from scripts.regions import default_regions
+
+# ---------- config ----------
+GEOJSON_PATH = Path(
+    "geoBoundaries-KAZ-ADM1-all/geoBoundaries-KAZ-ADM1_simplified.geojson"
+)
+ARTIFACT_DIR = Path("data/geometry")
+ARTIFACT_NAME = "kaz_adm1"
+ARTIFACT_VERSION = 2
+PRECISION = 4  # decimal degrees, ~11 m
+
+# district boundaries for the ADM2 view; no Shymkent patch needed there
+ADM2_PATH = Path("geoBoundaries-KAZ-ADM2-all/geoBoundaries-KAZ-ADM2_simplified.geojson")
+ADM2_NAME = "kaz_adm2"
+
+# (name, max zoom, tolerance in degrees, decimal places), coarsest first. At
+# zoom z a pixel spans ~360 / (256 * 2**z) degrees; each level keeps its
+# error well under a pixel up to its max zoom. "high" is the source, only
+# quantized.
+LEVELS = [
+    ("low", 4.5, 0.02, 2),
+    ("medium", 6.5, 0.005, 3),
+    ("high", float("inf"), 0.0, PRECISION),
+]
+
+# Shymkent is missing from the geoBoundaries ADM1 release
+SHYMKENT = {
+    "shapeName": "Shymkent",
+    "shapeISO": "KZ-SHY",
+    "shapeID": "9891525B68436750823948",
+    "shapeGroup": "KAZ",
+    "shapeType": "ADM1",
+}
+SHYMKENT_WKT = """POLYGON ((69.42977905273443 42.29850387573242, 69.440658569336 42.256446838378906,
+69.5219955444336 42.27233505249035, 69.53115844726562 42.296615600585994, 69.57532501220714 42.28984832763672,
+69.60591888427734 42.26734542846691, 69.64803314208996 42.285514831543026, 69.72393798828136 42.264495849609375,
+69.71796417236334 42.33912658691412, 69.67385864257812 42.345897674560604, 69.67630004882812 42.362247467041016,
+69.7154312133789 42.35989379882818, 69.66631317138683 42.408203125000114, 69.71104431152344 42.405490875244084,
+69.69738006591803 42.42692184448242, 69.64393615722662 42.44665908813488, 69.61659240722656 42.41533660888672,
+69.62030792236334 42.43984985351568, 69.58672332763678 42.44188690185547, 69.57182312011719 42.41804504394531,
+69.52764129638683 42.42483901977545, 69.50846862792969 42.37234115600586, 69.46366119384766 42.37501907348633,
+69.42977905273443 42.29850387573242))"""
+
+REGION_PROPS = ["shapeName", "shapeISO", "shapeID", "shapeGroup", "shapeType"]
+
+
+@dataclass(frozen=True)
+class Geometry:
+    geojson_text: str
+    regions: pd.DataFrame = field(compare=False)
+    sha256: str
+    level: str = "high"
+
+    @cached_property
+    def geojson(self) -> dict:
+        return json.loads(self.geojson_text)
+
+
+# ---------- build ----------
+def patched_frame(src: Path, patch: bool = True):
+    import geopandas as gpd
+    from shapely import wkt
+    from shapely.geometry import MultiPolygon, Polygon
+
+    gdf = gpd.read_file(src)
+    if not patch:
+        return gdf
+    geom = wkt.loads(SHYMKENT_WKT)
+    if gdf.geom_type.unique().tolist() == ["MultiPolygon"] and isinstance(
+        geom, Polygon
+    ):
+        geom = MultiPolygon([geom])
+
+    row = {col: None for col in gdf.columns}
+    for k, v in {**SHYMKENT, "geometry": geom}.items():
+        if k in row:
+            row[k] = v
+
+    new_gdf = gpd.GeoDataFrame([row], crs=gdf.crs)
+    return pd.concat([gdf, new_gdf], ignore_index=True)
+
+
+def simplify_coverage(geoms, tolerance: float, patched):
+    """Simplify the source polygons as one coverage so neighbours keep shared edges.
+
+    Patched features overlap the coverage (Shymkent sits inside its oblast),
+    so they are simplified on their own.
+    """
+    import shapely
+
+    geoms = np.asarray(geoms, dtype=object)
+    if tolerance <= 0:
+        return geoms
+    patched = np.asarray(patched, dtype=bool)
+    out = geoms.copy()
+    out[~patched] = shapely.coverage_simplify(geoms[~patched], tolerance)
+    out[patched] = shapely.simplify(geoms[patched], tolerance, preserve_topology=True)
+    return out
+
+
+def _quantize_ring(ring: list, precision: int) -> list:
+    out = []
+    for x, y, *_ in ring:
+        pt = [round(x, precision), round(y, precision)]
+        if not out or pt != out[-1]:
+            out.append(pt)
+    if len(out) < 4:
+        return [[round(x, precision), round(y, precision)] for x, y, *_ in ring]
+    return out
+
+
+def quantize(geometry: dict, precision: int) -> dict:
+    coords = geometry["coordinates"]
+    if geometry["type"] == "Polygon":
+        coords = [_quantize_ring(r, precision) for r in coords]
+    elif geometry["type"] == "MultiPolygon":
+        coords = [[_quantize_ring(r, precision) for r in poly] for poly in coords]
+    return {"type": geometry["type"], "coordinates": coords}
+
+
+def artifact_key(src: Path, patch: bool = True) -> str:
+    h = hashlib.sha256()
+    h.update(Path(src).read_bytes())
+    h.update(f"v{ARTIFACT_VERSION}:{LEVELS}".encode())
+    if patch:
+        h.update(SHYMKENT_WKT.encode())
+    return h.hexdigest()
+
+
+def manifest_path(out_dir: Path = ARTIFACT_DIR, name: str = ARTIFACT_NAME) -> Path:
+    return Path(out_dir) / f"{name}.json"
+
+
+def pick_level(zoom: float, mode: str = "page") -> str:
+    """Coarsest level that stays sub-pixel at `zoom`.
+
+    "page" is the published HTML, where every byte is downloaded and parsed;
+    "widget" is the notebook, where users zoom in freely and the geometry
+    never crosses the network, so it goes one level finer.
+    """
+    if mode not in ("page", "widget"):
+        raise ValueError(f"unknown export mode {mode!r}")
+    i = next(i for i, (_, max_zoom, *_) in enumerate(LEVELS) if zoom <= max_zoom)
+    if mode == "widget":
+        i = min(i + 1, len(LEVELS) - 1)
+    return LEVELS[i][0]
+
+
+def prepare_geometry(
+    src: Path = GEOJSON_PATH,
+    out_dir: Path = ARTIFACT_DIR,
+    *,
+    name: str = ARTIFACT_NAME,
+    patch: bool = True,
+) -> Path:
+    """Patch, simplify per level, quantize and serialize once; return the manifest path."""
+    out_dir = Path(out_dir)
+    key = artifact_key(src, patch)
+    manifest = manifest_path(out_dir, name)
+    if manifest.exists():
+        meta = json.loads(manifest.read_text(encoding="utf-8"))
+        if meta.get("key") == key and all(
+            (out_dir / lv["file"]).exists() for lv in meta["levels"].values()
+        ):
+            return manifest
+
+    frame = patched_frame(src, patch)
+    # the patch rows are appended after the source features
+    patched = np.arange(len(frame)) >= len(frame) - int(patch)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    levels, collection = {}, None
+    for level, max_zoom, tolerance, precision in LEVELS:
+        simple = frame.set_geometry(
+            simplify_coverage(frame.geometry.values, tolerance, patched),
+            crs=frame.crs,
+        )
+        collection = json.loads(simple.to_json())
+        for feat in collection["features"]:
+            feat["geometry"] = quantize(feat["geometry"], precision)
+        text = json.dumps(collection, ensure_ascii=False, separators=(",", ":"))
+        data_file = f"{name}-v{ARTIFACT_VERSION}-{key[:16]}-{level}.geojson"
+        (out_dir / data_file).write_text(text, encoding="utf-8")
+        levels[level] = {
+            "file": data_file,
+            "sha256": hashlib.sha256(text.encode("utf-8")).hexdigest(),
+            "max_zoom": max_zoom if max_zoom != float("inf") else None,
+            "tolerance": tolerance,
+            "precision": precision,
+            "bytes": len(text.encode("utf-8")),
+        }
+
+    meta = {
+        "version": ARTIFACT_VERSION,
+        "key": key,
+        "source": str(src),
+        "levels": levels,
+        "regions": [
+            {k: f["properties"].get(k) for k in REGION_PROPS}
+            for f in collection["features"]
+        ],
+    }
+    manifest.write_text(
+        json.dumps(meta, ensure_ascii=False, indent=1), encoding="utf-8"
+    )
+    current = {lv["file"] for lv in levels.values()}
+    for stale in out_dir.glob(f"{name}-v*.geojson"):
+        if stale.name not in current:
+            stale.unlink(missing_ok=True)
+    return manifest
+
+
+# ---------- load ----------
+def load_geometry(
+    out_dir: Path = ARTIFACT_DIR,
+    *,
+    name: str = ARTIFACT_NAME,
+    src: Path | None = GEOJSON_PATH,
+    level: str = "high",
+    patch: bool = True,
+) -> Geometry:
+    """Load one level of the prebuilt artifact, rebuilding it first if `src` changed."""
+    if src is not None and Path(src).exists():
+        manifest = prepare_geometry(src, out_dir, name=name, patch=patch)
+    else:
+        manifest = manifest_path(out_dir, name)
+        if not manifest.exists():
+            raise FileNotFoundError(
+                f"{manifest} not found; run `python -m scripts.geometry` first"
+            )
+
+    meta = json.loads(manifest.read_text(encoding="utf-8"))
+    if meta.get("version") != ARTIFACT_VERSION:
+        raise ValueError(
+            f"{manifest} has artifact version {meta.get('version')}, "
+            f"expected {ARTIFACT_VERSION}; rebuild it"
+        )
+    if level not in meta["levels"]:
+        raise ValueError(f"{manifest} has no level {level!r}")
+    entry = meta["levels"][level]
+    text = (Path(out_dir) / entry["file"]).read_text(encoding="utf-8")
+    regions = pd.DataFrame(meta["regions"], columns=REGION_PROPS)
+    regions["code"] = default_regions().codes(regions["shapeName"])
+    return Geometry(
+        geojson_text=text, regions=regions, sha256=entry["sha256"], level=level
+    )
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Build the region geometry artifact.")
+    ap.add_argument("--adm", choices=["ADM1", "ADM2"], default="ADM1")
+    ap.add_argument("--source", type=Path, default=None)
+    ap.add_argument("--out-dir", type=Path, default=ARTIFACT_DIR)
+    args = ap.parse_args(argv)
+    if args.adm == "ADM1":
+        src, name, patch = args.source or GEOJSON_PATH, ARTIFACT_NAME, True
+    else:
+        src, name, patch = args.source or ADM2_PATH, ADM2_NAME, False
+    manifest = prepare_geometry(src, args.out_dir, name=name, patch=patch)
+    meta = json.loads(manifest.read_text(encoding="utf-8"))
+    for level, entry in meta["levels"].items():
+        print(f"{level}\t{entry['bytes']:>10,} B\t{entry['file']}")
+    print(f"Saved: {manifest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import json
+from pathlib import Path
+
+# ---------- indicator registry ----------
+# One entry per published dashboard; see indicators.json.
+REGISTRY_PATH = Path(__file__).with_name("indicators.json")
+REQUIRED_KEYS = ("slug", "score_col", "question_col", "mapping", "title", "y_range")
+
+
+def load_indicators(path: Path = REGISTRY_PATH) -> list[dict]:
+    indicators = json.loads(Path(path).read_text(encoding="utf-8"))
+    seen = set()
+    for i, ind in enumerate(indicators):
+        missing = [k for k in REQUIRED_KEYS if k not in ind]
+        if missing:
+            raise ValueError(f"{path}: indicator #{i} is missing {', '.join(missing)}")
+        if ind["slug"] in seen:
+            raise ValueError(f"{path}: duplicate slug {ind['slug']!r}")
+        seen.add(ind["slug"])
+    return indicators
+
+
+def question_columns(indicators: list[dict]) -> list[str]:
+    return list(dict.fromkeys(ind["question_col"] for ind in indicators))
@@ -0,0 +1,90 @@
+import hashlib
+from pathlib import Path
+
+import pandas as pd
+
+# ---------- survey schema ----------
+REGION_COL = "Область"
+YEAR_COL = "Год"
+MONTH_COL = "Месяц"
+KEY_COLS = [REGION_COL, YEAR_COL, MONTH_COL]
+
+CACHE_DIR = Path("data/cache")
+CACHE_VERSION = 1
+
+
+def file_sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _cache_path(path: Path, columns: list[str], cache_dir: Path) -> Path:
+    # the key covers the file content, the requested columns and the cache layout
+    key = hashlib.sha256()
+    key.update(file_sha256(path).encode())
+    key.update(f"v{CACHE_VERSION}".encode())
+    key.update("\x1f".join(columns).encode("utf-8"))
+    return cache_dir / f"{path.stem}-{key.hexdigest()[:16]}.parquet"
+
+
+def _csv_options(question_cols: list[str]) -> dict:
+    columns = KEY_COLS + [c for c in question_cols if c not in KEY_COLS]
+    return dict(
+        usecols=columns,
+        dtype={c: "category" for c in columns if c not in (YEAR_COL, MONTH_COL)},
+    )
+
+
+def _finish(df: pd.DataFrame, question_cols: list[str]) -> pd.DataFrame:
+    for c in (YEAR_COL, MONTH_COL):
+        df[c] = pd.to_numeric(df[c], downcast="integer")
+    return df[KEY_COLS + [c for c in question_cols if c not in KEY_COLS]]
+
+
+def read_survey_csv(path: Path, question_cols: list[str]) -> pd.DataFrame:
+    return _finish(pd.read_csv(path, **_csv_options(question_cols)), question_cols)
+
+
+def iter_survey_chunks(path: Path, question_cols: list[str], chunksize: int):
+    """Yield bounded-size frames with the same columns and dtypes as read_survey_csv."""
+    with pd.read_csv(path, chunksize=chunksize, **_csv_options(question_cols)) as it:
+        for chunk in it:
+            yield _finish(chunk, question_cols)
+
+
+def load_survey(
+    path: Path,
+    question_cols: list[str],
+    *,
+    cache_dir: Path | None = CACHE_DIR,
+) -> pd.DataFrame:
+    """Read only the key and question columns, with a Parquet cache keyed on file hash."""
+    path = Path(path)
+    if cache_dir is None:
+        return read_survey_csv(path, question_cols)
+
+    columns = KEY_COLS + [c for c in question_cols if c not in KEY_COLS]
+    cache_dir = Path(cache_dir)
+    cached = _cache_path(path, columns, cache_dir)
+    if cached.exists():
+        try:
+            return pd.read_parquet(cached)
+        except ImportError:
+            return read_survey_csv(path, question_cols)
+
+    df = read_survey_csv(path, question_cols)
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = cached.with_suffix(".tmp")
+        df.to_parquet(tmp, index=False)
+        tmp.replace(cached)
+    except ImportError:
+        # no parquet engine installed: run uncached
+        return df
+    for stale in cache_dir.glob(f"{path.stem}-*.parquet"):
+        if stale != cached:
+            stale.unlink(missing_ok=True)
+    return df
@@ -0,0 +1,72 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from scripts.regions import NO_REGION, RegionResolver, default_regions
+
+CSV_LE = Path("data/LE_2017_2021.csv")
+MISSING = "—"
+
+
+@dataclass(frozen=True, eq=False)
+class LifeExpTable:
+    """Region x year life expectancy matrix, rows addressed by region code."""
+
+    codes: np.ndarray  # region code of each row
+    years: list[int]
+    values: np.ndarray  # len(codes) x len(years), NaN where missing
+    rows: np.ndarray = field(init=False)  # code -> row, -1 where missing
+    cells: list[list[str]] = field(init=False)
+
+    def __post_init__(self):
+        fmt = np.where(np.isnan(self.values), MISSING, np.char.mod("%.1f", self.values))
+        rows = np.full(int(self.codes.max()) + 1 if len(self.codes) else 0, -1)
+        rows[self.codes] = np.arange(len(self.codes))
+        object.__setattr__(self, "rows", rows)
+        object.__setattr__(self, "cells", fmt.tolist())
+
+    def _row(self, code: int) -> int:
+        return int(self.rows[code]) if 0 <= code < len(self.rows) else -1
+
+    def formatted(self, code: int) -> list[str]:
+        i = self._row(code)
+        if i < 0:
+            return [MISSING] * len(self.years)
+        return self.cells[i]
+
+    def as_cells(self, n_regions: int) -> list[list[str] | None]:
+        # one entry per region code, for array lookups in the page
+        return [
+            self.cells[self._row(c)] if self._row(c) >= 0 else None
+            for c in range(n_regions)
+        ]
+
+
+def _by_code(wide: pd.DataFrame, regions: RegionResolver | None) -> LifeExpTable:
+    regions = regions or default_regions()
+    codes = regions.codes(wide.index)
+    wide = wide[codes != NO_REGION].groupby(codes[codes != NO_REGION]).last()
+    return LifeExpTable(
+        codes=wide.index.to_numpy(dtype=np.intp),
+        years=[int(c) for c in wide.columns],
+        values=wide.to_numpy(dtype=float),
+    )
+
+
+def load_life_exp(
+    path: Path = CSV_LE, regions: RegionResolver | None = None
+) -> LifeExpTable:
+    wide = pd.read_csv(path).set_index("Region")
+    return _by_code(wide[[c for c in wide.columns if str(c).isdigit()]], regions)
+
+
+def from_long(
+    le_long: pd.DataFrame, regions: RegionResolver | None = None
+) -> LifeExpTable:
+    # (region_en, year, life_expectancy) rows, as used in the GIS notebook
+    wide = le_long.pivot_table(
+        index="region_en", columns="year", values="life_expectancy", aggfunc="last"
+    )
+    return _by_code(wide.reindex(columns=sorted(wide.columns)), regions)
@@ -1,28 +1,286 @@
+import functools
+import logging
+import time
+from collections import deque
+
 import pandas as pd
-import plotly.express as px
 import numpy as np
 import plotly.graph_objects as go
-from IPython.display import display
-import ipywidgets as widgets
 
+from scripts.aggregate import month_frames, rolling_bands
+from scripts.geometry import load_geometry, pick_level
+from scripts.life_exp import LifeExpTable, from_long
+from scripts.regions import default_regions
+from scripts.seasons import month_span, season_bands
+from scripts.serve import ServiceClient
+
+logger = logging.getLogger(__name__)
+
+# (region, parameter, milliseconds, cache hit) for the most recent clicks
+CLICK_TIMINGS = deque(maxlen=1000)
+PAYLOAD_CACHE_SIZE = 64
+DEFAULT_SPAN = (pd.Timestamp("2017-01-01"), pd.Timestamp("2021-05-01"))
+MAP_ZOOM = 3.0
+# small multiples: cells per row, blank months between cells, row pitch in cell heights
+OVERVIEW_COLS = 6
+OVERVIEW_GAP = 4
+OVERVIEW_ROW = 1.4
+
+
+def click_latency_summary() -> dict:
+    ms = sorted(t[2] for t in CLICK_TIMINGS)
+    if not ms:
+        return {"clicks": 0}
+    return {
+        "clicks": len(ms),
+        "hit_rate": sum(t[3] for t in CLICK_TIMINGS) / len(ms),
+        "p50_ms": ms[len(ms) // 2],
+        "p95_ms": ms[min(len(ms) - 1, int(len(ms) * 0.95))],
+        "max_ms": ms[-1],
+    }
+
+
+def _map_hover(parameter: str) -> str:
+    # plotly express' template, naming the indicator shown
+    return (
+        "<b>%{hovertext}</b><br><br>shapeName=%{location}<br>"
+        f"{parameter}=%{{z}}<extra></extra>"
+    )
+
+
+def _series_table(ts_df: dict, parameter: str) -> pd.DataFrame:
+    # every region's series stacked into one (region_en, date) frame
+    parts = {
+        reg: sub.set_index("date")[[parameter]].astype(float)
+        for reg, sub in ts_df.items()
+        if isinstance(reg, str)
+    }
+    if not parts:
+        return pd.DataFrame(
+            {parameter: []},
+            index=pd.MultiIndex.from_arrays([[], []], names=["region_en", "date"]),
+        )
+    table = pd.concat(parts, names=["region_en", "date"])
+    return table.sort_index(level=["region_en", "date"], sort_remaining=False)
+
+
+def small_multiples(dates, values, names, y_range=None, cols=OVERVIEW_COLS) -> dict:
+    """Lay a month x region matrix (see month_frames) out as a grid of cells.
+
+    Returns x, y and hover text for one trace, NaN between regions, plus the
+    cell labels and frames as annotations and shapes. Regions with no data
+    are left out; y is scaled to y_range (or the data's range) per cell.
+    """
+    keep = ~np.isnan(values).all(axis=0)
+    values, names = values[:, keep], [n for n, k in zip(names, keep) if k]
+    months, n = values.shape
+    if y_range is not None:
+        lo, hi = y_range
+    elif n:
+        lo, hi = np.nanmin(values), np.nanmax(values)
+    else:
+        lo, hi = 0.0, 1.0
+    scale = (hi - lo) or 1.0
+
+    k = np.arange(n)
+    dx = (k % cols) * (months + OVERVIEW_GAP)
+    dy = -(k // cols) * OVERVIEW_ROW
+    x = np.full((n, months + 1), np.nan)
+    y = np.full((n, months + 1), np.nan)
+    x[:, :-1] = dx[:, None] + np.arange(months)
+    y[:, :-1] = dy[:, None] + (values.T - lo) / scale
+
+    labels = pd.DatetimeIndex(dates).strftime("%Y-%m")
+    text = []
+    for name, col in zip(names, values.T):
+        text += [f"{name}<br>{m}: {v:.2f}" for m, v in zip(labels, col)] + [""]
+    rows = -(-n // cols)
+    return {
+        "x": x.ravel(),
+        "y": y.ravel(),
+        "text": text,
+        "annotations": [
+            dict(
+                x=float(a),
+                y=float(b) + 1,
+                text=name,
+                showarrow=False,
+                xanchor="left",
+                yanchor="bottom",
+                font=dict(size=10),
+            )
+            for a, b, name in zip(dx, dy, names)
+        ],
+        "shapes": [
+            dict(
+                type="rect",
+                layer="below",
+                x0=float(a) - 0.5,
+                x1=float(a) + months - 0.5,
+                y0=float(b),
+                y1=float(b) + 1,
+                line=dict(width=0.5, color="#ccc"),
+            )
+            for a, b in zip(dx, dy)
+        ],
+        "yrange": [1.25 - rows * OVERVIEW_ROW, 1.3],
+        "height": 80 + rows * 110,
+    }
+
+
+def overview_figure(grid: dict, title: str = "All regions, month by month"):
+    """Every region's series in a single WebGL trace (see small_multiples)."""
+    return go.Figure(
+        data=[
+            go.Scattergl(
+                x=grid["x"],
+                y=grid["y"],
+                text=grid["text"],
+                mode="lines",
+                line=dict(width=1.5, color="#2c7fb8"),
+                hovertemplate="%{text}<extra></extra>",
+                showlegend=False,
+            )
+        ],
+        layout=go.Layout(
+            title=dict(text=title, font=dict(size=13)),
+            height=grid["height"],
+            width=1040,
+            margin=dict(l=10, r=10, t=40, b=10),
+            xaxis=dict(visible=False),
+            yaxis=dict(visible=False, range=grid["yrange"]),
+            annotations=grid["annotations"],
+            shapes=grid["shapes"],
+            paper_bgcolor="rgba(0,0,0,0)",
+            plot_bgcolor="rgba(0,0,0,0)",
+        ),
+    )
+
+
+def frames_from_aggregates(agg, parameter: str, regions: pd.DataFrame):
+    """Map frame and per-region series for plot_interactive_map, read off the cube."""
+    resolver = default_regions()
+    codes = regions["code"].to_numpy()
+    df = regions.assign(
+        region_en=[resolver.names[c] if c >= 0 else None for c in codes],
+        **{parameter: resolver.dense(agg.regional[parameter])[codes]},
+    )
+    series = pd.concat(
+        {
+            parameter: agg.monthly[parameter],
+            "ci_lower": agg.ci_lower[parameter],
+            "ci_upper": agg.ci_upper[parameter],
+        },
+        axis=1,
+    ).rename_axis(["region_en", "date"])
+    ts_df = {
+        resolver.names[code]: sub.droplevel(0).reset_index()
+        for code, sub in series.groupby(level=0, sort=False)
+    }
+    return df, ts_df
+
+
+def indicator_frames(agg, indicators: list[dict], regions: pd.DataFrame):
+    """frames_from_aggregates for several indicators: one map frame with a
+    column per score_col, and each indicator's series keyed by score_col."""
+    df, ts_dfs = regions, {}
+    for ind in indicators:
+        col = ind["score_col"]
+        frame, ts_dfs[col] = frames_from_aggregates(agg, col, regions)
+        df = df.assign(region_en=frame["region_en"], **{col: frame[col]})
+    return df, ts_dfs
+
+
+def plot_interactive_map(
+    df,
+    ts_df,
+    le_long,
+    parameter,
+    title,
+    y_range=None,
+    geometry=None,
+    cache_size=PAYLOAD_CACHE_SIZE,
+    service=None,
+    animate=False,
+    overview=False,
+):
+    """Choropleth with a click-driven sparkline and life-expectancy table.
+
+    With service (URL of a running scripts/serve.py), ts_df and le_long may be
+    None: each clicked region's series and LE row are fetched on demand.
+    animate adds a month slider and play button under the map; overview a
+    small-multiples panel of every region's series below it. Both read ts_df.
+    """
+    if service is None and (ts_df is None or le_long is None):
+        raise ValueError("ts_df and le_long are required without a service URL")
+    indicator = {"score_col": parameter, "title": title, "y_range": y_range}
+    plot_indicator_maps(
+        df,
+        {parameter: ts_df} if ts_df is not None else None,
+        le_long,
+        [indicator],
+        geometry=geometry,
+        cache_size=cache_size,
+        service=service,
+        animate=animate,
+        overview=overview,
+    )
+
+
+def plot_indicator_maps(
+    df,
+    ts_dfs,
+    le_long,
+    indicators,
+    geometry=None,
+    cache_size=PAYLOAD_CACHE_SIZE,
+    service=None,
+    animate=False,
+    overview=False,
+):
+    """One map, sparkline and table for several indicators, with a dropdown.
+
+    df has a column per indicator's score_col and ts_dfs maps score_col to
+    that indicator's series (see indicator_frames). The geometry is sent once;
+    switching restyles the map's z and re-reads the selected region's series.
+    """
+    if service is None and (ts_dfs is None or le_long is None):
+        raise ValueError("ts_dfs and le_long are required without a service URL")
+
+    # widget-only dependencies: importing this module stays cheap
+    import ipywidgets as widgets
+    import plotly.express as px
+    from IPython.display import display
+
+    if geometry is None:
+        geometry = load_geometry(level=pick_level(MAP_ZOOM, "widget"))
+
+    by_col = {ind["score_col"]: ind for ind in indicators}
+    parameter = indicators[0]["score_col"]
+    state = {"parameter": parameter, "region": None}
 
-def plot_interactive_map(df, ts_df, le_long, parameter, title, y_range=None):
     fig = px.choropleth_map(
         df,
-        geojson=df.geometry.__geo_interface__,
-        locations=df.index,
+        geojson=geometry.geojson,
+        locations="shapeName",
+        featureidkey="properties.shapeName",
         color=parameter,
         hover_name="region_en",
         center={"lat": 48.0, "lon": 67.0},
-        zoom=3.0,
+        zoom=MAP_ZOOM,
         opacity=0.75,
         color_continuous_scale="YlGn",
         labels={parameter: "Scale"},
     )
 
-    fig.update_traces(customdata=np.stack([df["region_en"]], axis=-1))
+    fig.update_traces(
+        customdata=np.stack([df["region_en"]], axis=-1),
+        hovertemplate=_map_hover(parameter),
+    )
 
-    fig.update_layout(margin={"r": 0, "t": 40, "l": 0, "b": 0}, title=title)
+    fig.update_layout(
+        margin={"r": 0, "t": 40, "l": 0, "b": 0}, title=indicators[0]["title"]
+    )
 
     fig_map = go.FigureWidget(fig)
 
@@ -69,46 +327,40 @@ def plot_interactive_map(df, ts_df, le_long, parameter, title, y_range=None):
         )
     )
 
-    def _season_color(month: int) -> str:
-        if month in (12, 1, 2):
-            return "rgba(0,0,255,0.10)"
-        if month in (3, 4, 5):
-            return "rgba(0,128,0,0.10)"
-        if month in (6, 7, 8):
-            return "rgba(255,0,0,0.10)"
-        return "rgba(255,215,0,0.10)"
-
-    def _monthly_bands(x_start="2017-01-01", x_end="2021-05-31"):
-        x0 = pd.Timestamp(x_start).normalize()
-        x_end = pd.Timestamp(x_end).normalize()
-        shapes = []
-        cur = x0
-        while cur <= x_end:
-            nxt = (cur + pd.offsets.MonthEnd(1)).normalize()
-            shapes.append(
-                dict(
-                    type="rect",
-                    xref="x",
-                    x0=cur,
-                    x1=nxt,
-                    yref="paper",
-                    y0=0,
-                    y1=1,
-                    line={"width": 0},
-                    layer="below",
-                    fillcolor=_season_color(cur.month),
-                )
-            )
-            cur = (cur + pd.offsets.MonthBegin(1)).normalize()
-        return shapes
+    client = ServiceClient(service) if service else None
+    ts_dfs = ts_dfs or {}
+    tables = {p: _series_table(ts_dfs.get(p) or {}, p) for p in by_col}
+
+    @functools.lru_cache(maxsize=None)
+    def _frames(param: str):
+        # month x location z matrix: one pivot of the series table, per indicator
+        if not len(tables[param]):
+            return pd.DatetimeIndex([]), np.empty((0, len(df)))
+        return month_frames(tables[param][param], df["region_en"])
+
+    @functools.lru_cache(maxsize=None)
+    def _grid(param: str):
+        # region x month cells for the overview, from the same kind of pivot
+        names = tables[param].index.get_level_values("region_en").unique()
+        dates, values = month_frames(tables[param][param], names)
+        return small_multiples(dates, values, list(names), by_col[param]["y_range"])
 
-    spark.update_layout(shapes=_monthly_bands("2017-01-01", "2021-05-31"))
+    @functools.lru_cache(maxsize=None)
+    def _bands(param: str):
+        # only needed for series that come without CI columns
+        return rolling_bands(tables[param])
+
+    dates = [t.index.get_level_values("date") for t in tables.values() if len(t)]
+    x_start, x_end = month_span(dates[0].append(dates[1:])) if dates else DEFAULT_SPAN
+    x_end = x_end + pd.offsets.MonthEnd(0)
+    y_range = indicators[0]["y_range"]
+    band_lo, band_hi = y_range if y_range is not None else (0.0, 4.0)
 
     spark.update_xaxes(
         type="date",
         dtick="M1",
         tickformat="%Y.%m",
-        range=[pd.Timestamp("2017-01-01"), pd.Timestamp("2021-05-31")],
+        range=[x_start, x_end],
         tickangle=90,
         showline=True,
         linewidth=1,
@@ -161,6 +413,8 @@ def plot_interactive_map(df, ts_df, le_long, parameter, title, y_range=None):
         )
     )
 
+    spark.add_trace(go.Bar(season_bands(x_start, x_end, band_lo, band_hi)))
+
     spark.update_layout(
         legend=dict(
             orientation="v",
@@ -174,15 +428,6 @@ def plot_interactive_map(df, ts_df, le_long, parameter, title, y_range=None):
         )
     )
 
-    def _compute_ci(series_y: pd.Series, window: int = 3):
-        m = series_y.rolling(window=window, min_periods=2, center=True).mean()
-        s = series_y.rolling(window=window, min_periods=2, center=True).std(ddof=1)
-        ci_up = m + 1.96 * (s.fillna(0))
-        ci_lo = m - 1.96 * (s.fillna(0))
-        ci_up = ci_up.fillna(series_y + 0.05)
-        ci_lo = ci_lo.fillna(series_y - 0.05)
-        return ci_lo, ci_up
-
     table_fig = go.FigureWidget(
         go.Figure(
             data=[
@@ -204,38 +449,63 @@ def plot_interactive_map(df, ts_df, le_long, parameter, title, y_range=None):
         )
     )
 
-    def _update_le_table(region_en: str):
-        sub = le_long[le_long["region_en"] == region_en].copy()
-        years = list(range(2017, 2022))
-        m = {int(r["year"]): r["life_expectancy"] for _, r in sub.iterrows()}
-        vals = [m.get(y, None) for y in years]
-        vals_fmt = [
-            ("—" if (v is None or pd.isna(v)) else f"{float(v):.1f}") for v in vals
-        ]
+    if le_long is None:
+        le = None
+    else:
+        le = le_long if isinstance(le_long, LifeExpTable) else from_long(le_long)
+    resolver = default_regions()
 
+    def _update_le_table(region_en: str):
+        code = resolver.code(region_en)
+        if le is not None:
+            years, cells = le.years, le.formatted(code)
+        else:
+            years, cells = client.life_exp(code) or ([], [])
         with table_fig.batch_update():
-            table_fig.data[0].cells.values = [years, vals_fmt]
+            table_fig.data[0].cells.values = [years, cells]
             table_fig.layout.title = f"Life Expectancy"
 
-    def _on_click(trace, points, state):
-        if not points.point_inds:
-            return
-        idx = points.point_inds[0]
-
-        region_en = trace.customdata[idx][0]
-        if region_en not in ts_df or region_en is None:
-            return
-
-        series = ts_df[region_en].copy()
-        series = series.sort_values("date")
+    @functools.lru_cache(maxsize=cache_size)
+    def _payload(region_en: str, parameter: str):
+        # everything a click assigns, built (or fetched) once per region
+        y_range = by_col[parameter]["y_range"]
+        if client is not None:
+            series = client.series(parameter, resolver.code(region_en))
+            if series is None:
+                return None
+            series = series.rename(columns={"value": parameter})
+        else:
+            series = ts_dfs[parameter][region_en].sort_values("date")
         x_vals = pd.to_datetime(series["date"]).dt.to_pydatetime()
         y_vals = series[parameter].astype(float)
 
         if {"ci_lower", "ci_upper"}.issubset(series.columns):
-            ci_lo = series["ci_lower"].astype(float)
-            ci_up = series["ci_upper"].astype(float)
+            ci_lo = series["ci_lower"].astype(float).to_numpy()
+            ci_up = series["ci_upper"].astype(float).to_numpy()
+        else:
+            bands_lo, bands_up = _bands(parameter)
+            ci_lo = bands_lo.loc[region_en, parameter].to_numpy()
+            ci_up = bands_up.loc[region_en, parameter].to_numpy()
+
+        if y_range is not None:
+            yrange = list(y_range)
+        elif len(series) and y_vals.notna().any():
+            yrange = [max(y_vals.min() - 0.1, 0), min(y_vals.max() + 0.1, 4)]
         else:
-            ci_lo, ci_up = _compute_ci(y_vals, window=3)
+            yrange = None
+        return x_vals, y_vals.to_numpy(), ci_lo, ci_up, yrange
+
+    def _show_series(region_en: str) -> bool | None:
+        # the selected region's series for the current indicator; None if absent
+        parameter = state["parameter"]
+        if client is None and region_en not in ts_dfs.get(parameter, {}):
+            return None
+        hits = _payload.cache_info().hits
+        payload = _payload(region_en, parameter)
+        hit = _payload.cache_info().hits > hits
+        if payload is None:
+            return None
+        x_vals, y_vals, ci_lo, ci_up, yrange = payload
 
         with spark.batch_update():
             spark.data[0].x = x_vals
@@ -246,32 +516,130 @@ def plot_interactive_map(df, ts_df, le_long, parameter, title, y_range=None):
 
             spark.data[2].x = x_vals
             spark.data[2].y = y_vals
-
-            spark.update_xaxes(
-                type="date",
-                dtick="M1",
-                tickformat="%Y.%m",
-                tickangle=90,
-                showline=True,
-                linewidth=1,
-                linecolor="black",
-                showgrid=False,
-                tickfont=dict(size=6),
-                range=[pd.Timestamp("2017-01-01"), pd.Timestamp("2021-05-31")],
-            )
+            spark.data[2].name = parameter
 
             spark.layout.title = f"{region_en}"
-            if y_range is not None:
-                spark.layout.yaxis.range = list(y_range)
-            elif len(series) and y_vals.notna().any():
-                ymin = max(y_vals.min() - 0.1, 0)
-                ymax = min(y_vals.max() + 0.1, 4)
-                spark.layout.yaxis.range = [ymin, ymax]
+            if yrange is not None:
+                spark.layout.yaxis.range = yrange
+        return hit
+
+    def _on_click(trace, points, _state):
+        if not points.point_inds:
+            return
+        t0 = time.perf_counter()
+        idx = points.point_inds[0]
 
+        region_en = trace.customdata[idx][0]
+        if region_en is None:
+            return
+        hit = _show_series(region_en)
+        if hit is None:
+            return
+        state["region"] = region_en
         _update_le_table(region_en)
 
+        ms = (time.perf_counter() - t0) * 1000
+        CLICK_TIMINGS.append((region_en, state["parameter"], ms, hit))
+        logger.debug(
+            "click %s/%s: %.1f ms (%s)",
+            region_en,
+            state["parameter"],
+            ms,
+            "cached" if hit else "built",
+        )
+
+    if animate:
+        month = widgets.IntSlider(
+            value=0, min=0, max=0, readout=False, layout=widgets.Layout(width="360px")
+        )
+        play = widgets.Play(value=0, min=0, max=0, interval=400)
+        month_label = widgets.Label()
+        widgets.jslink((play, "value"), (month, "value"))
+
+        def _show_month(i: int):
+            # frame 0 is the pooled mean; frame i the i-th month. Only z changes
+            parameter = state["parameter"]
+            dates, frames = _frames(parameter)
+            if i == 0 or not len(dates):
+                z = df[parameter].to_numpy(dtype=float)
+                span = f"{dates[0]:%Y}–{dates[-1]:%Y}" if len(dates) else ""
+            else:
+                z, span = frames[i - 1], f"{dates[i - 1]:%Y-%m}"
+            fig_map.data[0].z = z
+            month_label.value = span
+
+        def _reset_months():
+            # one colour scale for every month of the current indicator
+            parameter = state["parameter"]
+            dates, frames = _frames(parameter)
+            values = np.concatenate(
+                [df[parameter].to_numpy(dtype=float), frames.ravel()]
+            )
+            finite = values[np.isfinite(values)]
+            with fig_map.batch_update():
+                if len(finite):
+                    fig_map.layout.coloraxis.cmin = float(finite.min())
+                    fig_map.layout.coloraxis.cmax = float(finite.max())
+                month.max = play.max = len(dates)
+                month.value = 0
+                _show_month(0)
+
+        month.observe(lambda change: _show_month(change["new"]), names="value")
+
+    def _on_switch(change):
+        # same geometry and layout: new z (the colorbar rescales with it),
+        # hover label, title, season band height and the selected region's series
+        ind = by_col[change["new"]]
+        state["parameter"] = ind["score_col"]
+        lo, hi = ind["y_range"] if ind["y_range"] is not None else (0.0, 4.0)
+        with fig_map.batch_update():
+            if animate:
+                _reset_months()
+            else:
+                fig_map.data[0].z = df[ind["score_col"]].to_numpy(dtype=float)
+            fig_map.data[0].hovertemplate = _map_hover(ind["score_col"])
+            fig_map.layout.title.text = ind["title"]
+        with spark.batch_update():
+            bands = spark.data[-1]
+            bands.base = lo
+            bands.y = [hi - lo] * len(bands.x)
+            if ind["y_range"] is not None:
+                spark.layout.yaxis.range = list(ind["y_range"])
+        if overview:
+            _show_overview()
+        if state["region"] is not None:
+            _show_series(state["region"])
+
+    if overview:
+        overview_fig = go.FigureWidget(overview_figure(_grid(parameter)))
+
+        def _show_overview():
+            grid = _grid(state["parameter"])
+            with overview_fig.batch_update():
+                trace = overview_fig.data[0]
+                trace.x, trace.y, trace.text = grid["x"], grid["y"], grid["text"]
+                overview_fig.layout.annotations = grid["annotations"]
+                overview_fig.layout.shapes = grid["shapes"]
+                overview_fig.layout.yaxis.range = grid["yrange"]
+                overview_fig.layout.height = grid["height"]
+
     fig_map.data[0].on_click(_on_click)
 
+    left = fig_map
+    if animate:
+        _reset_months()
+        left = widgets.VBox([fig_map, widgets.HBox([play, month, month_label])])
     right = widgets.VBox([spark, table_fig])
-    box = widgets.HBox([fig_map, right])
+    box = widgets.HBox([left, right])
+    if overview:
+        box = widgets.VBox([box, overview_fig])
+    if len(indicators) > 1:
+        picker = widgets.Dropdown(
+            options=[(ind["title"], ind["score_col"]) for ind in indicators],
+            value=parameter,
+            description="Indicator",
+            layout=widgets.Layout(width="520px"),
+        )
+        picker.observe(_on_switch, names="value")
+        box = widgets.VBox([picker, box])
     display(box)
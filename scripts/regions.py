@@ -0,0 +1,71 @@
+import json
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# ---------- region registry ----------
+# One entry per map region; its position is the region code. `name` is the
+# GeoJSON shapeName and LE-table name, `iso` the ISO 3166-2 letter code that
+# geoBoundaries puts in shapeISO; `aliases` cover survey spellings and the
+# post-2020 numeric ISO codes.
+REGISTRY_PATH = Path(__file__).with_name("regions.json")
+NO_REGION = -1
+
+
+@dataclass(frozen=True, eq=False)
+class RegionResolver:
+    """Survey names, shapeName, ISO codes and LE names -> small integer codes."""
+
+    names: list[str]  # code -> canonical name
+    iso: list[str]  # code -> ISO 3166-2
+    lookup: dict[str, int]  # any known spelling -> code
+    _index: pd.Index = field(init=False)
+    _codes: np.ndarray = field(init=False)
+
+    def __post_init__(self):
+        # unknown spellings index -1, i.e. the trailing NO_REGION
+        codes = np.array([*self.lookup.values(), NO_REGION], dtype=np.int16)
+        object.__setattr__(self, "_index", pd.Index(list(self.lookup)))
+        object.__setattr__(self, "_codes", codes)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def code(self, name) -> int:
+        return self.lookup.get(name, NO_REGION)
+
+    def codes(self, values) -> np.ndarray:
+        if isinstance(getattr(values, "dtype", None), pd.CategoricalDtype):
+            # resolve the few categories, then gather by category code
+            cat = pd.Categorical(values)
+            table = self._codes[self._index.get_indexer(cat.categories)]
+            return np.append(table, np.int16(NO_REGION))[cat.codes]
+        return self._codes[self._index.get_indexer(pd.Index(values))]
+
+    def dense(self, values: pd.Series) -> np.ndarray:
+        """Code-indexed values as a flat array; missing codes and NO_REGION read NaN."""
+        out = np.full(len(self) + 1, np.nan)
+        out[values.index.to_numpy(dtype=np.intp)] = values.to_numpy(dtype=float)
+        return out
+
+
+def load_regions(path: Path = REGISTRY_PATH) -> RegionResolver:
+    entries = json.loads(Path(path).read_text(encoding="utf-8"))
+    lookup = {}
+    for code, entry in enumerate(entries):
+        for key in (entry["name"], entry["iso"], *entry.get("aliases", [])):
+            if lookup.setdefault(key, code) != code:
+                raise ValueError(f"{path}: {key!r} names two regions")
+    return RegionResolver(
+        names=[e["name"] for e in entries],
+        iso=[e["iso"] for e in entries],
+        lookup=lookup,
+    )
+
+
+@lru_cache(maxsize=None)
+def default_regions() -> RegionResolver:
+    return load_regions()
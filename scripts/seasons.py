@@ -0,0 +1,60 @@
+import pandas as pd
+
+# ---------- season background ----------
+SEASON_COLORS = {
+    "winter": "rgba(0,0,255,0.10)",
+    "spring": "rgba(0,128,0,0.10)",
+    "summer": "rgba(255,0,0,0.10)",
+    "autumn": "rgba(255,215,0,0.10)",
+}
+MONTH_SEASON = {
+    12: "winter",
+    1: "winter",
+    2: "winter",
+    3: "spring",
+    4: "spring",
+    5: "spring",
+    6: "summer",
+    7: "summer",
+    8: "summer",
+    9: "autumn",
+    10: "autumn",
+    11: "autumn",
+}
+
+
+def season_color(month: int) -> str:
+    return SEASON_COLORS[MONTH_SEASON[month]]
+
+
+def month_span(dates) -> tuple[pd.Timestamp, pd.Timestamp]:
+    dates = pd.DatetimeIndex(dates).dropna()
+    return (
+        dates.min().to_period("M").to_timestamp(),
+        dates.max().to_period("M").to_timestamp(),
+    )
+
+
+def season_bands(start, end, y0: float = 0.0, y1: float = 1.0) -> dict:
+    """go.Bar kwargs for one bar per month from `start` to `end`, tinted by season.
+
+    One trace replaces a layout rect per month; it sits in the bar layer,
+    below the scatter traces of the same subplot.
+    """
+    starts = pd.date_range(
+        pd.Timestamp(start).to_period("M").to_timestamp(),
+        pd.Timestamp(end),
+        freq="MS",
+    )
+    widths = (starts + pd.offsets.MonthBegin(1) - starts) / pd.Timedelta(milliseconds=1)
+    return dict(
+        x=starts.strftime("%Y-%m-%d").tolist(),
+        y=[y1 - y0] * len(starts),
+        base=y0,
+        width=widths.astype(int).tolist(),
+        offset=0,
+        marker=dict(color=[season_color(m) for m in starts.month], line=dict(width=0)),
+        hoverinfo="skip",
+        showlegend=False,
+        name="season",
+    )
@@ -0,0 +1,310 @@
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+from dataclasses import dataclass
+from functools import lru_cache
+from http import HTTPStatus
+from pathlib import Path
+from urllib.error import HTTPError
+from urllib.parse import unquote, urlsplit
+from urllib.request import Request, urlopen
+
+import pandas as pd
+
+from scripts.aggregate import Aggregates, region_slices
+from scripts.cube import CUBE_DIR, CubeStore
+from scripts.encode import (
+    dumps,
+    from_typed_array,
+    month_dates,
+    month_index,
+    series_payload,
+)
+from scripts.indicators import REGISTRY_PATH, load_indicators
+from scripts.life_exp import LifeExpTable
+from scripts.regions import RegionResolver
+
+# ---------- config ----------
+HOST = "127.0.0.1"
+PORT = 8765
+MEMO_SIZE = 4096  # memoized responses, one per path
+GZIP_MIN = 1024  # smaller bodies go out uncompressed
+CLIENT_TIMEOUT = 10.0
+
+
+# ---------- data ----------
+class SeriesData:
+    """Region series, CI bands and life-expectancy rows from pre-aggregated cells.
+
+    Indicators are addressed by slug or by score column, regions by code.
+    """
+
+    def __init__(
+        self,
+        agg: Aggregates,
+        indicators: list[dict],
+        le_table: LifeExpTable,
+        regions: RegionResolver,
+    ):
+        self.agg = agg
+        self.le_table = le_table
+        self.regions = regions
+        self.indicators = {}
+        for ind in indicators:
+            self.indicators[ind["slug"]] = ind
+            self.indicators.setdefault(ind["score_col"], ind)
+        self._columns = {}
+
+    def _column(self, score_col: str):
+        # per indicator, once: month indices, values, bands and each region's rows
+        if score_col not in self._columns:
+            series = self.agg.monthly[score_col]
+            self._columns[score_col] = (
+                month_index(series.index.get_level_values("date")),
+                series.to_numpy(dtype=float),
+                self.agg.ci_lower[score_col].to_numpy(dtype=float),
+                self.agg.ci_upper[score_col].to_numpy(dtype=float),
+                dict(region_slices(series.index)),
+            )
+        return self._columns[score_col]
+
+    def indicator_list(self) -> list[dict]:
+        return [
+            {k: ind[k] for k in ("slug", "score_col", "title", "y_range")}
+            for key, ind in self.indicators.items()
+            if key == ind["slug"]
+        ]
+
+    def series(self, indicator: str, code: int) -> dict | None:
+        ind = self.indicators.get(indicator)
+        if ind is None or ind["score_col"] not in self.agg.monthly:
+            return None
+        months, values, lower, upper, slices = self._column(ind["score_col"])
+        sl = slices.get(code)
+        if sl is None:
+            return None
+        return series_payload(months[sl], values[sl], lower[sl], upper[sl])
+
+    def life_exp(self, code: int) -> dict | None:
+        if not 0 <= code < len(self.regions):
+            return None
+        return {"years": self.le_table.years, "values": self.le_table.formatted(code)}
+
+
+def load_series_data(
+    indicators: list[dict],
+    chunksize: int | None = None,
+    *,
+    survey: Path | None = None,
+    store: Path = CUBE_DIR,
+) -> SeriesData:
+    """The exporter's inputs: the cube store (brought up to date) and LE table.
+
+    survey defaults to the exporter's survey CSV.
+    """
+    from scripts import export2html as E
+    from scripts.regions import default_regions
+
+    store, _ = E.update_store(
+        indicators, chunksize, CubeStore(store), survey or E.CSV_SURVEY
+    )
+    return SeriesData(
+        E.store_aggregates(store, indicators),
+        indicators,
+        E.life_exp_table(),
+        default_regions(),
+    )
+
+
+# ---------- HTTP ----------
+@dataclass(frozen=True)
+class Response:
+    status: int
+    body: bytes
+    etag: str | None = None
+    gz: bytes | None = None
+
+
+def json_response(obj, status: int = 200) -> Response:
+    body = dumps(obj).encode("utf-8")
+    etag = '"' + hashlib.sha256(body).hexdigest()[:20] + '"'
+    gz = gzip.compress(body, mtime=0) if len(body) >= GZIP_MIN else None
+    return Response(status, body, etag, gz)
+
+
+def _code(part: str) -> int | None:
+    try:
+        return int(part)
+    except ValueError:
+        return None
+
+
+class DataService:
+    """GET-only JSON service over asyncio streams; responses memoized by path.
+
+    /indicators, /regions, /series/<indicator>/<code>, /life_exp/<code>
+    """
+
+    def __init__(self, data: SeriesData, memo_size: int = MEMO_SIZE):
+        self.data = data
+        self.respond = lru_cache(maxsize=memo_size)(self._respond)
+
+    def _respond(self, path: str) -> Response:
+        parts = [unquote(p) for p in path.strip("/").split("/")]
+        code = _code(parts[-1])
+        if parts == ["indicators"]:
+            payload = self.data.indicator_list()
+        elif parts == ["regions"]:
+            payload = self.data.regions.names
+        elif parts[0] == "series" and len(parts) == 3 and code is not None:
+            payload = self.data.series(parts[1], code)
+        elif parts[0] == "life_exp" and len(parts) == 2 and code is not None:
+            payload = self.data.life_exp(code)
+        else:
+            payload = None
+        if payload is None:
+            return json_response({"error": f"not found: {path}"}, 404)
+        return json_response(payload)
+
+    def encode(self, resp: Response, method: str, headers: dict) -> bytes:
+        status, body = resp.status, resp.body
+        extra = []
+        if resp.etag and resp.etag in headers.get("if-none-match", ""):
+            status, body = 304, b""
+        elif resp.gz and "gzip" in headers.get("accept-encoding", ""):
+            body = resp.gz
+            extra.append("Content-Encoding: gzip")
+        lines = [
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+            "Content-Type: application/json",
+            "Cache-Control: no-cache",  # revalidate with If-None-Match every time
+            "Vary: Accept-Encoding",
+            "Access-Control-Allow-Origin: *",
+            "Access-Control-Expose-Headers: ETag",
+            *extra,
+        ]
+        if resp.etag:
+            lines.append(f"ETag: {resp.etag}")
+        if status != 304:
+            lines.append(f"Content-Length: {len(body)}")
+        head = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+        return head if method == "HEAD" else head + body
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # HTTP/1.1 keep-alive: one request after another until the client is done
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ")
+                except ValueError:
+                    writer.write(self.encode(json_response({}, 400), "GET", {}))
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    key, _, value = line.partition(":")
+                    if key:
+                        headers[key.strip().lower()] = value.strip()
+
+                if method in ("GET", "HEAD"):
+                    resp = self.respond(urlsplit(target).path)
+                else:
+                    resp = json_response({"error": f"{method} not allowed"}, 405)
+                writer.write(self.encode(resp, method, headers))
+                await writer.drain()
+                if version == "HTTP/1.0" or headers.get("connection") == "close":
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = HOST, port: int = PORT):
+        server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+# ---------- client ----------
+class ServiceClient:
+    """Blocking client for notebooks: ETag revalidation, decoded NumPy arrays."""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip("/")
+        self._cache: dict[str, tuple[str, object]] = {}
+
+    def get(self, path: str):
+        req = Request(self.base_url + path, headers={"Accept-Encoding": "gzip"})
+        cached = self._cache.get(path)
+        if cached:
+            req.add_header("If-None-Match", cached[0])
+        try:
+            with urlopen(req, timeout=CLIENT_TIMEOUT) as res:
+                body = res.read()
+                if res.headers.get("Content-Encoding") == "gzip":
+                    body = gzip.decompress(body)
+                obj = json.loads(body)
+                if res.headers.get("ETag"):
+                    self._cache[path] = (res.headers["ETag"], obj)
+                return obj
+        except HTTPError as e:
+            if e.code == 304 and cached:
+                return cached[1]
+            if e.code == 404:
+                return None
+            raise
+
+    def series(self, indicator: str, code: int) -> pd.DataFrame | None:
+        """date / value / ci_lower / ci_upper rows of one region's series."""
+        payload = self.get(f"/series/{indicator}/{code}")
+        if payload is None:
+            return None
+        return pd.DataFrame(
+            {
+                "date": month_dates(from_typed_array(payload["m"])),
+                "value": from_typed_array(payload["v"]).astype(float),
+                "ci_lower": from_typed_array(payload["lo"]).astype(float),
+                "ci_upper": from_typed_array(payload["hi"]).astype(float),
+            }
+        )
+
+    def life_exp(self, code: int) -> tuple[list[int], list[str]] | None:
+        payload = self.get(f"/life_exp/{code}")
+        return None if payload is None else (payload["years"], payload["values"])
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(
+        description="Serve region series and life expectancy from the cube store."
+    )
+    ap.add_argument("--host", default=HOST)
+    ap.add_argument("--port", type=int, default=PORT)
+    ap.add_argument("--indicators", type=Path, default=REGISTRY_PATH)
+    ap.add_argument("--chunksize", type=int, default=None)
+    ap.add_argument("--survey", type=Path, default=None)
+    ap.add_argument("--store", type=Path, default=CUBE_DIR)
+    args = ap.parse_args(argv)
+
+    service = DataService(
+        load_series_data(
+            load_indicators(args.indicators),
+            args.chunksize,
+            survey=args.survey,
+            store=args.store,
+        )
+    )
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
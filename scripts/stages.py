@@ -0,0 +1,138 @@
+import cProfile
+import resource
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+_STATUS = Path("/proc/self/status")
+_CLEAR_REFS = Path("/proc/self/clear_refs")
+
+
+def peak_rss_mb() -> float:
+    # VmHWM can be reset between stages; ru_maxrss is the process lifetime peak
+    try:
+        for line in _STATUS.read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def reset_peak_rss() -> bool:
+    try:
+        _CLEAR_REFS.write_text("5")
+        return True
+    except OSError:
+        return False
+
+
+@dataclass
+class StageResult:
+    name: str
+    wall_s: float
+    cpu_s: float
+    peak_rss_mb: float
+
+
+def _fields(r: StageResult) -> dict:
+    return {k: v for k, v in asdict(r).items() if k != "name"}
+
+
+class StageTimer:
+    """Wall time, CPU time and peak RSS per named stage of one run.
+
+    A disabled timer measures nothing; with profile=True every stage also
+    runs under its own cProfile.Profile, so the slowest can be dumped.
+    """
+
+    def __init__(self, enabled: bool = True, profile: bool = False):
+        self.enabled = enabled
+        self.profile = enabled and profile
+        self.results: list[StageResult] = []
+        self.builds: list[StageResult] = []
+        self.profiles: dict[str, cProfile.Profile] = {}
+        self.per_stage_rss = enabled and reset_peak_rss()
+
+    @contextmanager
+    def stage(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        prof = cProfile.Profile() if self.profile else None
+        reset_peak_rss()
+        wall, cpu = time.perf_counter(), time.process_time()
+        if prof:
+            prof.enable()
+        try:
+            yield
+        finally:
+            if prof:
+                prof.disable()
+                self.profiles[name] = prof
+            self.results.append(
+                StageResult(
+                    name,
+                    time.perf_counter() - wall,
+                    time.process_time() - cpu,
+                    peak_rss_mb(),
+                )
+            )
+
+    def timed(self, name: str, fn, *args):
+        """Call fn(*args) as one unit of work inside a stage, e.g. a dashboard build.
+
+        The peak RSS is not reset here, so a build's peak_rss_mb is its
+        stage's peak so far.
+        """
+        if not self.enabled:
+            return fn(*args)
+        wall, cpu = time.perf_counter(), time.process_time()
+        value = fn(*args)
+        self.builds.append(
+            StageResult(
+                name,
+                time.perf_counter() - wall,
+                time.process_time() - cpu,
+                peak_rss_mb(),
+            )
+        )
+        return value
+
+    def slowest(self) -> StageResult | None:
+        return max(self.results, key=lambda r: r.wall_s, default=None)
+
+    def dump_slowest(self, path: Path) -> str | None:
+        """Write the slowest stage's cProfile stats (pstats format) to path."""
+        slow = self.slowest()
+        if slow is None or slow.name not in self.profiles:
+            return None
+        self.profiles[slow.name].dump_stats(path)
+        return slow.name
+
+    def as_dict(self) -> dict:
+        return {r.name: _fields(r) for r in self.results}
+
+    def report(self) -> dict:
+        return {
+            "stages": self.as_dict(),
+            "builds": {r.name: _fields(r) for r in self.builds},
+            "total": {
+                "wall_s": sum(r.wall_s for r in self.results),
+                "cpu_s": sum(r.cpu_s for r in self.results),
+                "peak_rss_mb": max((r.peak_rss_mb for r in self.results), default=0.0),
+            },
+            "per_stage_rss": self.per_stage_rss,
+            "profiled": self.profile,
+        }
+
+    def table(self) -> str:
+        rows = [f"{'stage':<14}{'wall s':>9}{'cpu s':>9}{'peak MB':>10}"]
+        for r in self.results:
+            rows.append(
+                f"{r.name:<14}{r.wall_s:>9.3f}{r.cpu_s:>9.3f}{r.peak_rss_mb:>10.1f}"
+            )
+        return "\n".join(rows)
@@ -0,0 +1,106 @@
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from scripts.indicators import REGISTRY_PATH, load_indicators
+from scripts.ingest import MONTH_COL, REGION_COL, YEAR_COL
+
+# ---------- synthetic survey ----------
+# Same columns and answer vocabularies as data/survey_random.csv, random
+# answers. For benchmarks and for anyone without access to the real file.
+SURVEY_REGIONS = [
+    "г.Нур-Султан",
+    "г.Алматы",
+    "г.Шымкент",
+    "Акмолинская",
+    "Актюбинская",
+    "Алматинская",
+    "Атырауская",
+    "Восточно-Казахстанская",
+    "Жамбылская",
+    "Западно-Казахстанская",
+    "Карагандинская",
+    "Костанайская",
+    "Кызылординская",
+    "Мангистауская",
+    "Павлодарская",
+    "Северо-Казахстанская",
+    "Туркестанская",
+    "Южно-Казахстанская",
+]
+FIRST_MONTH = pd.Period("2017-01", "M")
+LAST_MONTH = pd.Period("2021-05", "M")
+UNSCORED = "Затрудняюсь ответить"  # answered, but outside every mapping
+SKIPPED = 0.05  # share of blank answers per question
+CHUNK_ROWS = 1_000_000
+
+
+def _answer_probs(rng, n_regions: int, n_answers: int) -> np.ndarray:
+    # each region leans its own way so the maps are not flat
+    return rng.dirichlet(np.full(n_answers, 4.0), size=n_regions)
+
+
+def _draw(rng, probs: np.ndarray, regions: np.ndarray) -> np.ndarray:
+    # inverse-CDF sampling of one answer per row from its region's distribution
+    cdf = probs.cumsum(axis=1)[regions]
+    cdf[:, -1] = 1.0
+    return (rng.random(len(regions))[:, None] > cdf).sum(axis=1)
+
+
+def synth_chunks(rows: int, indicators: list[dict], seed: int = 0):
+    """Yield frames of at most CHUNK_ROWS rows with the real survey schema."""
+    rng = np.random.default_rng(seed)
+    questions = {}
+    for ind in indicators:
+        vocab = [*ind["mapping"], UNSCORED]
+        questions.setdefault(ind["question_col"], vocab)
+    probs = {
+        q: _answer_probs(rng, len(SURVEY_REGIONS), len(v)) for q, v in questions.items()
+    }
+    n_months = (LAST_MONTH - FIRST_MONTH).n + 1
+
+    for start in range(0, rows, CHUNK_ROWS):
+        n = min(CHUNK_ROWS, rows - start)
+        regions = rng.integers(len(SURVEY_REGIONS), size=n)
+        months = rng.integers(n_months, size=n) + FIRST_MONTH.ordinal
+        data = {
+            REGION_COL: pd.Categorical.from_codes(regions, SURVEY_REGIONS),
+            YEAR_COL: months // 12 + 1970,
+            MONTH_COL: months % 12 + 1,
+            "Пол": pd.Categorical.from_codes(rng.integers(2, size=n), ["Ж", "М"]),
+        }
+        for q, vocab in questions.items():
+            codes = _draw(rng, probs[q], regions)
+            codes[rng.random(n) < SKIPPED] = -1
+            data[q] = pd.Categorical.from_codes(codes, vocab)
+        yield pd.DataFrame(data)
+
+
+def write_synth(
+    path: Path, rows: int, indicators: list[dict] | None = None, seed: int = 0
+) -> Path:
+    path = Path(path)
+    indicators = indicators or load_indicators()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    for i, chunk in enumerate(synth_chunks(rows, indicators, seed)):
+        chunk.to_csv(tmp, mode="w" if i == 0 else "a", header=i == 0, index=False)
+    tmp.replace(path)
+    return path
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Write a synthetic survey CSV.")
+    ap.add_argument("out", type=Path)
+    ap.add_argument("--rows", type=int, default=100_000)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--indicators", type=Path, default=REGISTRY_PATH)
+    args = ap.parse_args(argv)
+    write_synth(args.out, args.rows, load_indicators(args.indicators), args.seed)
+    print(f"Saved: {args.out} ({args.rows:,} rows)")
+
+
+if __name__ == "__main__":
+    main()